@@ -1,18 +1,26 @@
 from openai import AzureOpenAI
 import os
-import json
+from models.llm_output import ActivityPlan, parse_llm_output
+from services.llm_client import create_json_completion, get_llm_client
+from utils.mock_inventory import inventory
+from utils.prompting import OPTIONS_TOKEN_BUDGET, encode_table, log_llm_usage
 
 class ActivityAgent:
-    def __init__(self, client):
-        self.client = client
+    FIELDS = ("id", "name", "location", "duration", "price", "time_of_day", "category", "persona_match")
+
+    def __init__(self, client=None):
+        self.client = client or get_llm_client()
         self.model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
     
     def suggest_activities(self, destination, budget, persona, duration):
         """Suggest activities based on constraints"""
         
-        # Load mock activity data
-        with open('data/mock_activities.json', 'r') as f:
-            activity_data = json.load(f)
+        # Mock activities in the destination (all activities if the city is unknown),
+        # persona matches first so budget trimming drops the least relevant
+        activities = sorted(
+            inventory.activities(destination),
+            key=lambda a: (persona not in a.get('persona_match', []), a.get('price', 0))
+        )
         
         # Create prompt for LLM
         prompt = f"""
@@ -25,7 +33,7 @@ User Requirements:
 - Trip Duration: {duration} days
 
 Available Activities:
-{json.dumps(activity_data['activities'], indent=2)}
+{encode_table(activities, self.FIELDS, OPTIONS_TOKEN_BUDGET)}
 
 Instructions:
 1. Filter activities in the destination
@@ -58,7 +66,8 @@ Return ONLY the JSON, no markdown, no extra text.
 """
         
         # Call Azure OpenAI
-        response = self.client.chat.completions.create(
+        response = create_json_completion(
+            self.client,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
@@ -67,11 +76,6 @@ Return ONLY the JSON, no markdown, no extra text.
         
         # Parse response
         result = response.choices[0].message.content.strip()
-        
-        # Clean any markdown formatting
-        if result.startswith("```"):
-            result = result.split("```")[1]
-            if result.startswith("json"):
-                result = result[4:]
-        
-        return json.loads(result)
\ No newline at end of file
+        log_llm_usage("activity_agent", prompt, response, result)
+
+        return parse_llm_output(result, ActivityPlan)
\ No newline at end of file
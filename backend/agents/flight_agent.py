@@ -1,18 +1,26 @@
 from openai import AzureOpenAI
 import os
-import json
+from models.llm_output import FlightRecommendations, parse_llm_output
+from services.llm_client import create_json_completion, get_llm_client
+from utils.mock_inventory import inventory
+from utils.prompting import OPTIONS_TOKEN_BUDGET, encode_table, log_llm_usage
 
 class FlightAgent:
-    def __init__(self, client):
-        self.client = client
+    FIELDS = ("id", "airline", "from", "to", "departure", "arrival", "duration", "price", "class", "persona_match")
+
+    def __init__(self, client=None):
+        self.client = client or get_llm_client()
         self.model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
     
     def suggest_flights(self, destination, budget, persona, start_date):
         """Suggest flights based on constraints"""
         
-        # Load mock flight data
-        with open('data/mock_flights.json', 'r') as f:
-            flight_data = json.load(f)
+        # Mock flights into the destination (whole catalogue if none match),
+        # persona matches and cheapest first so budget trimming drops the least relevant
+        flights = sorted(
+            inventory.flights(destination=destination),
+            key=lambda f: (persona not in f.get('persona_match', []), f.get('price', 0))
+        )
         
         # Create prompt for LLM
         prompt = f"""
@@ -25,7 +33,7 @@ User Requirements:
 - Travel Date: {start_date}
 
 Available Flights:
-{json.dumps(flight_data['flights'], indent=2)}
+{encode_table(flights, self.FIELDS, OPTIONS_TOKEN_BUDGET)}
 
 Instructions:
 1. Filter flights that match the destination
@@ -51,7 +59,8 @@ Return ONLY the JSON, no markdown, no extra text.
 """
         
         # Call Azure OpenAI
-        response = self.client.chat.completions.create(
+        response = create_json_completion(
+            self.client,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7,
@@ -60,11 +69,6 @@ Return ONLY the JSON, no markdown, no extra text.
         
         # Parse response
         result = response.choices[0].message.content.strip()
-        
-        # Clean any markdown formatting
-        if result.startswith("```"):
-            result = result.split("```")[1]
-            if result.startswith("json"):
-                result = result[4:]
-        
-        return json.loads(result)
\ No newline at end of file
+        log_llm_usage("flight_agent", prompt, response, result)
+
+        return parse_llm_output(result, FlightRecommendations)
\ No newline at end of file
@@ -1,20 +1,21 @@
 from openai import AzureOpenAI
 import os
 import json
+from services.llm_client import get_llm_client
 from agents.flight_agent import FlightAgent
 from agents.hotel_agent import HotelAgent
 from agents.activity_agent import ActivityAgent
 from utils.helpers import calculate_trip_duration, allocate_budget
 
 class HostAgent:
-    def __init__(self, client):
-        self.client = client
+    def __init__(self, client=None):
+        self.client = client or get_llm_client()
         self.model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
         
         # Initialize specialist agents
-        self.flight_agent = FlightAgent(client)
-        self.hotel_agent = HotelAgent(client)
-        self.activity_agent = ActivityAgent(client)
+        self.flight_agent = FlightAgent(self.client)
+        self.hotel_agent = HotelAgent(self.client)
+        self.activity_agent = ActivityAgent(self.client)
     
     def plan_trip(self, user_input):
         """Main coordination function"""
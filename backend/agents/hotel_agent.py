@@ -1,19 +1,24 @@
 from openai import AzureOpenAI
 import os
-import json
+from models.llm_output import HotelRecommendation, parse_llm_output
+from services.llm_client import create_json_completion, get_llm_client
+from utils.mock_inventory import inventory
+from utils.prompting import OPTIONS_TOKEN_BUDGET, encode_table, log_llm_usage
 
 class HotelAgent:
-    def __init__(self, client):
-        self.client = client
+    FIELDS = ("id", "name", "location", "rating", "price_per_night", "amenities", "persona_match")
+
+    def __init__(self, client=None):
+        self.client = client or get_llm_client()
         self.model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
 
     def suggest_hotels(self, destination, budget, persona, duration):
 
-        with open('data/mock_hotels.json', 'r') as f:
-            hotel_data = json.load(f)
-
         # ✅ Filter BEFORE LLM
-        city_hotels = hotel_data.get(destination, [])
+        city_hotels = sorted(
+            inventory.hotels(destination),
+            key=lambda h: (persona not in h.get('persona_match', []), h.get('price_per_night', 0))
+        )
 
         if not city_hotels:
             return {"recommended_hotel": None}
@@ -27,7 +32,7 @@ User Requirements:
 - Stay Duration: {duration} nights
 
 Available Hotels:
-{json.dumps(city_hotels, indent=2)}
+{encode_table(city_hotels, self.FIELDS, OPTIONS_TOKEN_BUDGET)}
 
 Instructions:
 1. Calculate total cost (price_per_night × {duration})
@@ -47,7 +52,8 @@ Instructions:
 }}
 """
 
-        response = self.client.chat.completions.create(
+        response = create_json_completion(
+            self.client,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.5,
@@ -55,10 +61,6 @@ Instructions:
         )
 
         result = response.choices[0].message.content.strip()
+        log_llm_usage("hotel_agent", prompt, response, result)
 
-        if result.startswith("```"):
-            result = result.split("```")[1]
-            if result.startswith("json"):
-                result = result[4:]
-
-        return json.loads(result)
\ No newline at end of file
+        return parse_llm_output(result, HotelRecommendation)
\ No newline at end of file
@@ -1,18 +1,18 @@
 import os
-import json
 from datetime import datetime, timedelta
 from openai import AzureOpenAI
+from models.offers import Activity, FlightOffer, HotelOffer, to_wire
+from services.llm_client import get_llm_client
+from utils.metrics import track_upstream
+from utils.prompting import compact_json, log_llm_usage
 
 class ConversationManager:
-    def __init__(self):
-        self.client = AzureOpenAI(
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-        )
+    def __init__(self, client: AzureOpenAI = None):
+        self.client = client or get_llm_client()
         self.deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT")
         
         self.conversation_history = []
+        self.max_history = int(os.getenv("CONVERSATION_MAX_HISTORY", "40"))
         self.collected_info = {
             "departure_city": None,
             "destination": None,
@@ -53,16 +53,13 @@ STAGES:
 - complete: All done!
 
 Current stage: {stage}
-""".format(stage=self.current_stage, collected=json.dumps(self.collected_info, indent=2))
+""".format(stage=self.current_stage, collected=compact_json(self.collected_info))
     
     def process_message(self, user_message):
         """Process user message and return bot response"""
         
         # Add user message to history
-        self.conversation_history.append({
-            "role": "user",
-            "content": user_message
-        })
+        self._append_history("user", user_message)
         
         # Check if user is asking for specific things
         if self._is_flight_query(user_message):
@@ -81,10 +78,7 @@ Current stage: {stage}
         response = self._get_ai_response()
         
         # Add bot response to history
-        self.conversation_history.append({
-            "role": "assistant",
-            "content": response
-        })
+        self._append_history("assistant", response)
         
         # Update stage
         self._update_stage()
@@ -96,6 +90,12 @@ Current stage: {stage}
             "should_show_options": self._should_show_options()
         }
     
+    def _append_history(self, role, content):
+        """Append a turn, keeping only the most recent max_history messages"""
+        self.conversation_history.append({"role": role, "content": content})
+        if len(self.conversation_history) > self.max_history:
+            del self.conversation_history[:-self.max_history]
+    
     def _is_flight_query(self, message):
         keywords = ["flight", "flights", "fly", "cheapest flight", "show me flights"]
         return any(keyword in message.lower() for keyword in keywords)
@@ -262,16 +262,20 @@ Current stage: {stage}
     def _get_ai_response(self):
         """Get AI response using Azure OpenAI"""
         try:
-            response = self.client.chat.completions.create(
-                model=self.deployment,
-                messages=[
+            with track_upstream("conversation_llm"):
+                messages = [
                     {"role": "system", "content": self.get_system_prompt()},
                     *self.conversation_history
-                ],
-                temperature=0.7,
-                max_tokens=150
-            )
-            return response.choices[0].message.content
+                ]
+                response = self.client.chat.completions.create(
+                    model=self.deployment,
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=150
+                )
+            content = response.choices[0].message.content
+            log_llm_usage("conversation_llm", "\n".join(m["content"] for m in messages), response, content)
+            return content
         except Exception as e:
             print(f"❌ Error getting AI response: {e}")
             return self._get_fallback_response()
@@ -315,10 +319,11 @@ Current stage: {stage}
     
     def select_flight(self, flight_data):
         """User selected a flight"""
+        flight_data = FlightOffer.from_wire(flight_data)
         self.collected_info["selected_flight"] = flight_data
         self.current_stage = "hotels"
         return {
-            "message": f"Perfect choice! The {flight_data.get('airline', 'flight')} at ₹{flight_data.get('price', 0):,} is selected. Now let me show you some great hotels...",
+            "message": f"Perfect choice! The {flight_data.airline} at ₹{flight_data.price:,} is selected. Now let me show you some great hotels...",
             "collected_info": self.collected_info,
             "current_stage": "hotels",
             "should_show_options": "hotels"
@@ -326,10 +331,11 @@ Current stage: {stage}
     
     def select_hotel(self, hotel_data):
         """User selected a hotel"""
+        hotel_data = HotelOffer.from_wire(hotel_data)
         self.collected_info["selected_hotel"] = hotel_data
         self.current_stage = "activities"
         return {
-            "message": f"Excellent! {hotel_data.get('name', 'This hotel')} is a great choice. Now, here are some amazing activities you can do...",
+            "message": f"Excellent! {hotel_data.name or 'This hotel'} is a great choice. Now, here are some amazing activities you can do...",
             "collected_info": self.collected_info,
             "current_stage": "activities",
             "should_show_options": "activities"
@@ -337,11 +343,12 @@ Current stage: {stage}
     
     def select_activity(self, activity_data):
         """User selected an activity"""
+        activity_data = Activity.from_wire(activity_data)
         if activity_data not in self.collected_info["selected_activities"]:
             self.collected_info["selected_activities"].append(activity_data)
         
         return {
-            "message": f"Added {activity_data.get('name', 'activity')} to your itinerary! Feel free to select more activities or say 'done' when ready.",
+            "message": f"Added {activity_data.name or 'activity'} to your itinerary! Feel free to select more activities or say 'done' when ready.",
             "collected_info": self.collected_info,
             "current_stage": "activities",
             "should_show_options": None
@@ -366,4 +373,26 @@ Current stage: {stage}
         )
     
     def get_collected_info(self):
-        return self.collected_info
\ No newline at end of file
+        return self.collected_info
+    
+    def to_state(self):
+        """Serializable snapshot of the session (used by the session store)"""
+        return {
+            "collected_info": to_wire(self.collected_info),
+            "current_stage": self.current_stage,
+            "conversation_history": self.conversation_history
+        }
+    
+    def restore_state(self, state):
+        """Restore a snapshot produced by to_state() (empty fields may be omitted)"""
+        defaults = {key: [] if isinstance(value, list) else None for key, value in self.collected_info.items()}
+        self.collected_info.clear()
+        self.collected_info.update(defaults)
+        self.collected_info.update(state.get("collected_info", {}))
+        self.collected_info["selected_flight"] = FlightOffer.from_wire(self.collected_info["selected_flight"])
+        self.collected_info["selected_hotel"] = HotelOffer.from_wire(self.collected_info["selected_hotel"])
+        self.collected_info["selected_activities"] = [
+            Activity.from_wire(activity) for activity in self.collected_info["selected_activities"]
+        ]
+        self.current_stage = state.get("current_stage", self.current_stage)
+        self.conversation_history = list(state.get("conversation_history", []))
\ No newline at end of file
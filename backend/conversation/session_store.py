@@ -0,0 +1,161 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from conversation.state_backends import create_state_backend, decode_state, encode_state
+from utils.metrics import Counter
+
+SESSION_BACKEND_ERRORS = Counter(
+    "travel_session_backend_errors_total",
+    "Failed session state backend operations (the session continues in memory)",
+    labels=("op",)
+)
+
+
+class SessionStore:
+    """
+    Bounded in-memory store of ConversationManager sessions.
+
+    - LRU eviction once max_entries is reached
+    - idle TTL: sessions untouched for ttl_seconds are evicted
+    - optional state backend (see conversation/state_backends.py): every save is
+      written through in a compact encoding, and sessions are re-read from it on
+      each access, so evicted sessions resume and any worker/host can serve any
+      session without sticky routing; if the backend fails, the session carries
+      on from the in-memory copy rather than failing the request
+    """
+
+    def __init__(self, factory, backend=None, max_entries: int = None, ttl_seconds: float = None,
+                 state_ttl_seconds: float = None):
+        self.factory = factory
+        self.backend = backend if backend is not None else create_state_backend()
+        self.max_entries = max_entries or int(os.getenv("SESSION_MAX_ENTRIES", "1000"))
+        self.ttl_seconds = ttl_seconds or float(os.getenv("SESSION_TTL_SECONDS", "3600"))
+        self.state_ttl_seconds = state_ttl_seconds or float(os.getenv("SESSION_STATE_TTL_SECONDS", "604800"))
+
+        self._sessions = OrderedDict()  # session_id -> (manager, last_access), oldest first
+        self._lock = threading.Lock()
+        self._evicted = 0
+        self._restored = 0
+        self._backend_errors = 0
+
+    def get_or_create(self, session_id: str):
+        state = self._load(session_id)
+
+        with self._lock:
+            now = time.time()
+            self._evict_expired(now)
+
+            entry = self._sessions.get(session_id)
+            if entry:
+                manager = entry[0]
+                self._sessions.move_to_end(session_id)
+            else:
+                manager = self.factory()
+                self._evict_lru()
+                if state is not None:
+                    self._restored += 1
+                    print(f"♻️ Restored session {session_id} from {type(self.backend).__name__}")
+
+            # Another worker may have advanced this session since we last saw it
+            if state is not None:
+                manager.restore_state(state)
+            self._sessions[session_id] = (manager, now)
+            return manager
+
+    def save(self, session_id: str, manager=None):
+        """Write the session through to the backend (no-op for the in-memory default)"""
+        if self.backend is None:
+            return
+        if manager is None:
+            entry = self._sessions.get(session_id)
+            if not entry:
+                return
+            manager = entry[0]
+        try:
+            self.backend.save(session_id, encode_state(manager.to_state()), self.state_ttl_seconds)
+        except Exception as e:
+            self._backend_failed("save", session_id, e)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        if self.backend is not None:
+            try:
+                self.backend.delete(session_id)
+            except Exception as e:
+                self._backend_failed("delete", session_id, e)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def _load(self, session_id: str):
+        if self.backend is None:
+            return None
+        try:
+            blob = self.backend.load(session_id)
+            return decode_state(blob) if blob else None
+        except Exception as e:
+            # Serve the in-memory copy (or a fresh session) instead
+            self._backend_failed("load", session_id, e)
+            return None
+
+    def _backend_failed(self, op: str, session_id: str, error: Exception):
+        self._backend_errors += 1
+        SESSION_BACKEND_ERRORS.inc(op=op)
+        print(f"⚠️ Session {op} failed for {session_id} on {type(self.backend).__name__}: {error}")
+
+    # -----------------------------------
+    # EVICTION
+    # -----------------------------------
+
+    def _evict_expired(self, now: float):
+        # Entries are kept in access order, so expired ones are always at the front
+        while self._sessions:
+            session_id, (_, last_access) = next(iter(self._sessions.items()))
+            if now - last_access < self.ttl_seconds:
+                break
+            self._evict(session_id)
+
+    def _evict_lru(self):
+        while len(self._sessions) >= self.max_entries:
+            self._evict(next(iter(self._sessions)))
+
+    def _evict(self, session_id: str):
+        # With a backend the state was already written through on save()
+        self._sessions.pop(session_id)
+        self._evicted += 1
+
+    # -----------------------------------
+    # STATS
+    # -----------------------------------
+
+    def stats(self) -> dict:
+        with self._lock:
+            approx_bytes = sum(
+                len(json.dumps(manager.to_state(), default=str))
+                for manager, _ in self._sessions.values()
+            )
+            live_sessions = len(self._sessions)
+
+        stored_sessions = live_sessions
+        if self.backend is not None:
+            try:
+                stored_sessions = self.backend.count()
+            except Exception as e:
+                self._backend_failed("count", "*", e)
+                stored_sessions = None
+
+        return {
+            "live_sessions": live_sessions,
+            "approx_bytes": approx_bytes,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "evicted": self._evicted,
+            "restored": self._restored,
+            "backend_errors": self._backend_errors,
+            "backend": type(self.backend).__name__ if self.backend is not None else "memory",
+            "stored_sessions": stored_sessions,
+        }
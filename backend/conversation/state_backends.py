@@ -0,0 +1,191 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlparse
+
+
+# -----------------------------------
+# SERIALIZATION
+# -----------------------------------
+
+COMPRESS_THRESHOLD = 512
+
+
+def encode_state(state: dict) -> bytes:
+    """Compact wire format: JSON without whitespace or null fields, zlib'd when large"""
+    compact = dict(state)
+    if isinstance(compact.get("collected_info"), dict):
+        compact["collected_info"] = {k: v for k, v in compact["collected_info"].items() if v not in (None, [])}
+    raw = json.dumps(compact, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+    if len(raw) > COMPRESS_THRESHOLD:
+        return b"z" + zlib.compress(raw)
+    return b"j" + raw
+
+
+def decode_state(blob: bytes) -> dict:
+    if blob[:1] == b"z":
+        return json.loads(zlib.decompress(blob[1:]))
+    return json.loads(blob[1:])
+
+
+# -----------------------------------
+# BACKENDS
+# -----------------------------------
+
+class SQLiteStateBackend:
+    """Local file backend; shared by every worker on the same host"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions "
+            "(session_id TEXT PRIMARY KEY, state BLOB NOT NULL, expires_at REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def load(self, session_id: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM sessions WHERE session_id = ? AND expires_at >= ?",
+                (session_id, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id: str, blob: bytes, ttl: float):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, state, expires_at) VALUES (?, ?, ?)",
+                (session_id, blob, time.time() + ttl)
+            )
+            self._db.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+            self._db.commit()
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._db.commit()
+
+    def count(self):
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(*) FROM sessions WHERE expires_at >= ?", (time.time(),)
+            ).fetchone()[0]
+
+
+class RedisStateBackend:
+    """
+    Minimal RESP client (GET / SET EX / DEL) so any Redis-protocol server works,
+    including a local stand-in, without an extra dependency.
+    Shared by every worker and host pointed at the same server.
+    """
+
+    KEY_PREFIX = "travel:session:"
+
+    def __init__(self, url: str):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._lock = threading.Lock()
+        self._sock = None
+        self._reader = None
+
+    def load(self, session_id: str):
+        return self._command("GET", self.KEY_PREFIX + session_id)
+
+    def save(self, session_id: str, blob: bytes, ttl: float):
+        self._command("SET", self.KEY_PREFIX + session_id, blob, "EX", max(1, int(ttl)))
+
+    def delete(self, session_id: str):
+        self._command("DEL", self.KEY_PREFIX + session_id)
+
+    def count(self):
+        # Counting keys needs a SCAN over the whole keyspace; not worth it for stats
+        return None
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=5)
+        self._reader = self._sock.makefile("rb")
+        try:
+            if self.password:
+                self._send("AUTH", self.password)
+            if self.db:
+                self._send("SELECT", self.db)
+        except BaseException:
+            # Never keep a connection that is unauthenticated or on the wrong DB
+            self._close()
+            raise
+
+    def _command(self, *args):
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*args)
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt:
+                        raise
+
+    def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(f"${len(data)}\r\n".encode() + data + b"\r\n")
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode()
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {body.decode()}")
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            length = int(body)
+            if length == -1:
+                return None
+            data = self._reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(body)
+            return None if length == -1 else [self._read_reply() for _ in range(length)]
+        raise ConnectionError(f"Unexpected Redis reply: {line!r}")
+
+    def _close(self):
+        try:
+            if self._sock:
+                self._sock.close()
+        finally:
+            self._sock = None
+            self._reader = None
+
+
+def create_state_backend(kind: str = None):
+    """
+    SESSION_BACKEND = memory (default) | sqlite | redis
+      memory: no backend, sessions live only in this process's SessionStore
+      sqlite: SESSION_SQLITE_PATH (default sessions.db), shared by workers on one host
+      redis:  SESSION_REDIS_URL (default redis://localhost:6379/0), shared across hosts
+    """
+    spill_path = os.getenv("SESSION_SPILL_PATH")
+    kind = (kind or os.getenv("SESSION_BACKEND") or ("sqlite" if spill_path else "memory")).lower()
+    if kind == "sqlite":
+        return SQLiteStateBackend(os.getenv("SESSION_SQLITE_PATH") or spill_path or "sessions.db")
+    if kind == "redis":
+        return RedisStateBackend(os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0"))
+    return None
@@ -1,12 +1,14 @@
 from openai import AzureOpenAI
 import os
-import json
+from models.llm_output import DebateEntry, parse_llm_output
+from services.llm_client import create_json_completion, get_llm_client
+from utils.prompting import compact_json, format_options, log_llm_usage
 
 class AgentDebater:
     """Individual specialist agent that can debate"""
     
     def __init__(self, client, agent_type):
-        self.client = client
+        self.client = client or get_llm_client()
         self.model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
         self.agent_type = agent_type
         self.persona = self._get_persona()
@@ -40,13 +42,13 @@ Your priority: {self.persona['priority']}
 Your style: {self.persona['style']}
 
 Trip Context:
-{json.dumps(context, indent=2)}
+{compact_json(context)}
 
 Available Options:
-{json.dumps(options, indent=2)}
+{format_options(options)}
 
 Previous debate (if any):
-{json.dumps(debate_history, indent=2) if debate_history else "No previous arguments"}
+{compact_json(debate_history) if debate_history else "No previous arguments"}
 
 Your task:
 1. Analyze the options from YOUR perspective ({self.persona['priority']})
@@ -67,7 +69,8 @@ Return ONLY valid JSON with this structure:
 Return ONLY the JSON, no markdown, no extra text.
 """
         
-        response = self.client.chat.completions.create(
+        response = create_json_completion(
+            self.client,
             model=self.model,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.8,
@@ -75,11 +78,6 @@ Return ONLY the JSON, no markdown, no extra text.
         )
         
         result = response.choices[0].message.content.strip()
+        log_llm_usage(f"debate_{self.agent_type}", prompt, response, result)
         
-        # Clean markdown if present
-        if result.startswith("```"):
-            result = result.split("```")[1]
-            if result.startswith("json"):
-                result = result[4:]
-        
-        return json.loads(result)
\ No newline at end of file
+        return parse_llm_output(result, DebateEntry)
\ No newline at end of file
@@ -1,7 +1,12 @@
 from openai import AzureOpenAI
-import json
 import os
 from datetime import datetime
+from models.llm_output import DebateEntry, DebateResult, ItineraryDay, parse_llm_output, validate_item
+from services.llm_client import create_json_completion, get_llm_client
+from utils.geo import plan_days
+from utils.json_stream import JsonArrayStreamer
+from utils.metrics import track_upstream
+from utils.prompting import compact_json, format_options, log_llm_usage
 
 
 class DebateCoordinator:
@@ -10,9 +15,13 @@ class DebateCoordinator:
     Runs 3-agent debate + day-wise itinerary in ONE LLM call (fast).
     """
 
-    def __init__(self, client: AzureOpenAI):
-        self.client = client
+    INTERRUPTED_MESSAGE = "The debate was interrupted; the plan below is based on the part that finished."
+
+    def __init__(self, client: AzureOpenAI = None, id_only: bool = None):
+        self.client = client or get_llm_client()
         self.model = os.getenv("AZURE_OPENAI_DEPLOYMENT")
+        # ID-only mode: the model returns option IDs + short text, full objects are filled in here
+        self.id_only = os.getenv("DEBATE_ID_ONLY", "1") != "0" if id_only is None else id_only
 
     def conduct_debate(self, trip_context: dict, available_options: dict) -> dict:
         print("\n🎭 Starting Single-Call Agent Debate + Itinerary Generation...")
@@ -26,36 +35,206 @@ class DebateCoordinator:
         prompt = self._build_prompt(trip_context, available_options, num_days)
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=4000,
-            )
+            with track_upstream("debate_llm"):
+                response = create_json_completion(
+                    self.client,
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=4000,
+                )
 
             raw = response.choices[0].message.content.strip()
-            cleaned = self._clean_json(raw)
-
-            try:
-                result = json.loads(cleaned)
-            except json.JSONDecodeError:
-                last_brace = cleaned.rfind("}")
-                if last_brace != -1:
-                    try:
-                        result = json.loads(cleaned[: last_brace + 1])
-                    except json.JSONDecodeError:
-                        print("⚠️ JSON repair failed, using safe fallback")
-                        return self._safe_fallback(available_options)
-                else:
-                    return self._safe_fallback(available_options)
+            log_llm_usage("debate_llm", prompt, response, raw)
+            return self._parse_result(raw, available_options)
 
-            print("✅ Debate + itinerary complete!")
-            return result
+        except Exception as e:
+            print(f"❌ Debate error: {e}")
+            return self._safe_fallback(available_options)
+
+    def conduct_debate_stream(self, trip_context: dict, available_options: dict):
+        """
+        Streaming variant of conduct_debate.
+        Yields ("debate_entry", entry) and ("itinerary_day", day) as soon as each
+        object is complete in the token stream, then ("result", full_result).
+        If the stream breaks after something was yielded, ("debate_error", message)
+        comes before a result built from the streamed part (marked "partial").
+        """
+        print("\n🎭 Starting Streaming Agent Debate + Itinerary Generation...")
+
+        num_days = self._calculate_days(
+            trip_context.get("start_date", ""),
+            trip_context.get("end_date", "")
+        )
+        print(f"📅 Trip duration: {num_days} days")
+
+        prompt = self._build_prompt(trip_context, available_options, num_days)
+        streamer = JsonArrayStreamer(("debate_transcript", "itinerary"))
+        streamed = 0
+
+        try:
+            with track_upstream("debate_llm"):
+                stream = create_json_completion(
+                    self.client,
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=4000,
+                    stream=True,
+                )
+
+                for chunk in stream:
+                    # Azure sends content-filter chunks with no choices
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    for key, item in streamer.feed(delta):
+                        if key == "debate_transcript":
+                            entry = validate_item(DebateEntry, item)
+                            if entry is not None:
+                                streamed += 1
+                                yield ("debate_entry", self._rehydrate_entry(entry, available_options))
+                        else:
+                            day = validate_item(ItineraryDay, item)
+                            if day is not None:
+                                streamed += 1
+                                yield ("itinerary_day", self._rehydrate_day(day, available_options))
+
+            log_llm_usage("debate_llm", prompt, completion=streamer.buffer)
+            result = self._parse_result(streamer.buffer.strip(), available_options)
 
         except Exception as e:
             print(f"❌ Debate error: {e}")
+            if not streamed:
+                result = self._safe_fallback(available_options)
+            else:
+                yield ("debate_error", self.INTERRUPTED_MESSAGE)
+                result = self._interrupted_result(streamer.buffer, available_options)
+
+        yield ("result", result)
+
+    def _interrupted_result(self, raw: str, available_options: dict) -> dict:
+        """
+        Result for a stream that broke after entries or days reached the client:
+        built from what was streamed (marked partial), since the safe fallback
+        would contradict what the user has already seen
+        """
+        result = self._parse_result(raw.strip(), available_options)
+        result["partial"] = True
+        return result
+
+    def _parse_result(self, raw: str, available_options: dict) -> dict:
+        """Validated result; truncated output keeps every complete entry and day"""
+        try:
+            result = parse_llm_output(raw, DebateResult)
+        except ValueError as e:
+            print(f"⚠️ Unusable debate output ({e}), using safe fallback")
             return self._safe_fallback(available_options)
 
+        if result.get("partial"):
+            print("⚠️ Debate output was truncated, kept the complete entries and days")
+        else:
+            print("✅ Debate + itinerary complete!")
+        if self.id_only:
+            return self._rehydrate(result, available_options)
+
+        decision = result["final_decision"]
+        fallback = self._safe_fallback(available_options)["final_decision"]
+        for key in ("flight", "hotel", "activities"):
+            if not decision.get(key):
+                decision[key] = fallback[key]
+        return result
+
+    # -----------------------------------
+    # ID-ONLY REHYDRATION
+    # -----------------------------------
+
+    def _rehydrate(self, result: dict, available_options: dict) -> dict:
+        """Replace the IDs in an ID-only result with the full option objects the server already has"""
+        decision = result.get("final_decision", {})
+        flights = available_options.get("flights", [])
+        hotels = available_options.get("hotels", [])
+        activities = available_options.get("activities", [])
+
+        chosen_activities = [
+            activity for activity in
+            (self._lookup(activities, ref) for ref in decision.get("activity_ids", []))
+            if activity is not None
+        ]
+        result["debate_transcript"] = [
+            self._rehydrate_entry(entry, available_options) for entry in result.get("debate_transcript", [])
+        ]
+        result["final_decision"] = {
+            "flight": self._lookup(flights, decision.get("flight_id")) or (flights[0] if flights else None),
+            "hotel": self._lookup(hotels, decision.get("hotel_id")) or (hotels[0] if hotels else None),
+            "itinerary": [self._rehydrate_day(day, available_options) for day in decision.get("itinerary", [])],
+            "activities": chosen_activities or list(activities),
+            "reasoning": decision.get("reasoning", ""),
+            "key_tradeoffs": decision.get("key_tradeoffs", ""),
+        }
+        return result
+
+    def _rehydrate_entry(self, entry: dict, available_options: dict) -> dict:
+        """Debate entries reference options by ID; show names to the user"""
+        if not self.id_only:
+            return entry
+        entry["preferred_flight"] = self._label(available_options.get("flights", []), entry.get("preferred_flight"))
+        entry["preferred_hotel"] = self._label(available_options.get("hotels", []), entry.get("preferred_hotel"))
+        entry["preferred_activities"] = [
+            self._label(available_options.get("activities", []), ref)
+            for ref in entry.get("preferred_activities", [])
+        ]
+        return entry
+
+    def _rehydrate_day(self, day: dict, available_options: dict) -> dict:
+        """Fill each slot's activity fields from the activity record named by activity_id"""
+        if not self.id_only:
+            return day
+        activities = available_options.get("activities", [])
+        for slot in day.get("schedule", []):
+            activity = self._lookup(activities, slot.pop("activity_id", None))
+            if activity is None:
+                slot.setdefault("activity_name", "Free time")
+                continue
+            slot.update({
+                "activity_name": self._attr(activity, "name"),
+                "location": self._attr(activity, "address") or self._attr(activity, "location"),
+                "duration": self._attr(activity, "duration"),
+                "rating": self._attr(activity, "rating"),
+                "opening_hours": self._attr(activity, "opening_hours"),
+            })
+        return day
+
+    def _lookup(self, options: list, ref):
+        """Option whose id (or, failing that, name) matches ref"""
+        # Models echo unquoted table ids (Amadeus "1") back as numbers
+        if isinstance(ref, bool) or not isinstance(ref, (str, int, float)):
+            return None
+        ref = str(int(ref)) if isinstance(ref, float) and ref.is_integer() else str(ref).strip()
+        if not ref:
+            return None
+        for option in options:
+            if str(self._attr(option, "id")) == ref:
+                return option
+        ref = ref.lower()
+        for option in options:
+            if str(self._attr(option, "name") or "").lower() == ref:
+                return option
+        return None
+
+    def _label(self, options: list, ref):
+        option = self._lookup(options, ref)
+        if option is None:
+            return str(ref) if ref not in (None, "") else ""
+        return self._attr(option, "name") or f"{self._attr(option, 'airline', 'Flight')} {self._attr(option, 'id')}"
+
+    @staticmethod
+    def _attr(option, name: str, default=None):
+        """Field of an offer record or (legacy) option dict"""
+        if isinstance(option, dict):
+            return option.get(name, default)
+        return getattr(option, name, default)
+
     def _calculate_days(self, start_date: str, end_date: str) -> int:
         try:
             start = datetime.strptime(start_date, "%Y-%m-%d")
@@ -64,28 +243,40 @@ class DebateCoordinator:
         except Exception:
             return 3
 
+    def _day_plan_text(self, activities: list, num_days: int) -> str:
+        """Geographically grouped day plan for the prompt (empty when activities have no coordinates)"""
+        if not any(getattr(activity, "latitude", None) is not None for activity in activities):
+            return ""
+        lines = ["", "Suggested day plan (activities grouped by location, in visiting order; follow it):"]
+        for i, day in enumerate(plan_days(activities, num_days), start=1):
+            stops = " → ".join(f"{activity.name} ({activity.id})" for activity in day) or "free day"
+            lines.append(f"  Day {i}: {stops}")
+        return "\n".join(lines) + "\n"
+
     def _build_prompt(self, trip_context: dict, available_options: dict, num_days: int) -> str:
+        if self.id_only:
+            return self._build_id_prompt(trip_context, available_options, num_days)
         return f"""You are the coordinator of a travel planning debate between three AI agents.
 
 Trip Context:
-{json.dumps(trip_context, indent=2)}
+{compact_json(trip_context)}
 
 Available Options:
-{json.dumps(available_options, indent=2)}
+{format_options(available_options)}
 
 Number of days: {num_days}
-
+{self._day_plan_text(available_options.get("activities", []), num_days)}
 STEP 1 — Simulate a 2-round debate between:
   - 💰 Budget Agent (cost savings focus)
   - 💎 Luxury Agent (comfort & quality focus)
   - 🎭 Experience Agent (memorable activities focus)
 Each agent speaks ONE sentence per round (6 total entries in debate_transcript).
 
-STEP 2 — Create a {num_days}-day itinerary using the activities from available_options.activities.
+STEP 2 — Create a {num_days}-day itinerary using the activities listed above.
 Each day must have exactly 3 schedule slots: morning (9:00 AM), afternoon (1:00 PM), evening (6:00 PM).
 Each slot needs: time_slot, time, activity_name, location, duration, tips, rating, opening_hours.
 
-STEP 3 — Copy ALL activity objects from available_options.activities into final_decision.activities.
+STEP 3 — Copy ALL listed activities (as objects with the listed fields) into final_decision.activities.
 
 STEP 4 — Copy the FULL flight object and FULL hotel object into final_decision (not just IDs).
 
@@ -190,10 +381,71 @@ Return ONLY valid JSON, no markdown fences, no extra text:
   }}
 }}
 
-IMPORTANT: Fill final_decision.flight with the full flight object from available_options.flights[0].
-Fill final_decision.hotel with the full hotel object from available_options.hotels[0].
-Fill final_decision.activities with ALL objects from available_options.activities.
+IMPORTANT: Fill final_decision.flight with the full first flight listed.
+Fill final_decision.hotel with the full first hotel listed.
+Fill final_decision.activities with ALL listed activities.
 Create {num_days} day entries in itinerary (not just 1).
+"""
+
+    def _build_id_prompt(self, trip_context: dict, available_options: dict, num_days: int) -> str:
+        """Same task as _build_prompt, but the model answers with option IDs instead of copying objects"""
+        return f"""You are the coordinator of a travel planning debate between three AI agents.
+
+Trip Context:
+{compact_json(trip_context)}
+
+Available Options:
+{format_options(available_options)}
+
+Number of days: {num_days}
+{self._day_plan_text(available_options.get("activities", []), num_days)}
+STEP 1 — Simulate a 2-round debate between:
+  - 💰 Budget Agent (cost savings focus)
+  - 💎 Luxury Agent (comfort & quality focus)
+  - 🎭 Experience Agent (memorable activities focus)
+Each agent speaks ONE sentence per round (6 total entries in debate_transcript, in that agent order per round).
+
+STEP 2 — Create a {num_days}-day itinerary using the activities listed above.
+Each day has exactly 3 slots: morning (9:00 AM), afternoon (1:00 PM), evening (6:00 PM).
+
+Refer to every flight, hotel and activity ONLY by its "id". Never copy option details;
+the server fills them in.
+
+Return ONLY valid JSON, no markdown fences, no extra text:
+
+{{
+  "debate_transcript": [
+    {{
+      "agent": "Budget Agent",
+      "preferred_flight": "flight id",
+      "preferred_hotel": "hotel id",
+      "preferred_activities": ["activity id"],
+      "argument": "One sentence argument.",
+      "counterarguments": ""
+    }}
+  ],
+  "final_decision": {{
+    "flight_id": "flight id",
+    "hotel_id": "hotel id",
+    "activity_ids": ["activity id"],
+    "itinerary": [
+      {{
+        "day": 1,
+        "date": "{trip_context.get('start_date', '')}",
+        "theme": "Arrival & Exploration",
+        "schedule": [
+          {{"time_slot": "morning", "time": "9:00 AM", "activity_id": "activity id", "tips": "Short tip"}},
+          {{"time_slot": "afternoon", "time": "1:00 PM", "activity_id": "activity id", "tips": "Short tip"}},
+          {{"time_slot": "evening", "time": "6:00 PM", "activity_id": "activity id", "tips": "Short tip"}}
+        ]
+      }}
+    ],
+    "reasoning": "2-3 sentence explanation of choices.",
+    "key_tradeoffs": "What was balanced between agents."
+  }}
+}}
+
+Create {num_days} day entries in itinerary (not just 1) and 6 debate_transcript entries.
 """
 
     def _safe_fallback(self, available_options: dict) -> dict:
@@ -201,6 +453,7 @@ Create {num_days} day entries in itinerary (not just 1).
         hotels = available_options.get("hotels", [])
         activities = available_options.get("activities", [])
         return {
+            "fallback": True,
             "debate_transcript": [
                 {
                     "agent": "Budget Agent",
@@ -220,12 +473,3 @@ Create {num_days} day entries in itinerary (not just 1).
                 "key_tradeoffs": "Balanced cost and experience.",
             },
         }
-
-    def _clean_json(self, raw: str) -> str:
-        if raw.startswith("```"):
-            parts = raw.split("```")
-            content = parts[1] if len(parts) > 1 else raw
-            if content.startswith("json"):
-                content = content[4:]
-            return content.strip()
-        return raw
\ No newline at end of file
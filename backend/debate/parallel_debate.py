@@ -0,0 +1,187 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed
+from debate.agent_debater import AgentDebater
+from debate.debate_coordinator import DebateCoordinator
+from models.llm_output import ItineraryDay, validate_item
+from services.llm_client import create_json_completion
+from utils.json_stream import JsonArrayStreamer
+from utils.metrics import UPSTREAM_ERRORS, track_upstream
+from utils.prompting import compact_json, format_options, log_llm_usage
+
+# Shared by all debates; an agent that misses its round deadline keeps its
+# worker until the LLM call returns, so size this above 3x concurrent debates
+_AGENT_POOL = ThreadPoolExecutor(
+    max_workers=int(os.getenv("DEBATE_AGENT_CONCURRENCY", "24")),
+    thread_name_prefix="debate-agent"
+)
+
+
+class ParallelDebateCoordinator(DebateCoordinator):
+    """
+    Multi-call debate coordinator.
+    Budget, Luxury and Experience agents argue concurrently each round (each
+    sees only the previous round), then one short synthesis call picks the
+    options and lays out the itinerary. Agents that miss the round deadline
+    are dropped from that round rather than awaited.
+    """
+
+    AGENT_TYPES = ("budget", "luxury", "experience")
+
+    def __init__(self, client=None, rounds: int = None, round_deadline: float = None):
+        # Agents answer with option IDs, so the synthesis step is always ID-only
+        super().__init__(client, id_only=True)
+        self.rounds = rounds or int(os.getenv("DEBATE_ROUNDS", "2"))
+        self.round_deadline = round_deadline or float(os.getenv("DEBATE_ROUND_DEADLINE_SECONDS", "20"))
+        self.debaters = [AgentDebater(self.client, agent_type) for agent_type in self.AGENT_TYPES]
+
+    def conduct_debate(self, trip_context: dict, available_options: dict) -> dict:
+        for event, payload in self.conduct_debate_stream(trip_context, available_options):
+            if event == "result":
+                return payload
+
+    def conduct_debate_stream(self, trip_context: dict, available_options: dict):
+        """
+        Same events as DebateCoordinator.conduct_debate_stream: ("debate_entry", entry)
+        as each agent finishes, ("itinerary_day", day) while the synthesis streams,
+        ("debate_error", message) if the synthesis fails, then ("result", full_result).
+        """
+        print(f"\n🎭 Starting Parallel Agent Debate ({self.rounds} rounds)...")
+
+        num_days = self._calculate_days(
+            trip_context.get("start_date", ""),
+            trip_context.get("end_date", "")
+        )
+        print(f"📅 Trip duration: {num_days} days")
+
+        arguments = []
+        previous = None
+        for round_number in range(1, self.rounds + 1):
+            current = []
+            for argument in self._run_round(round_number, trip_context, available_options, previous):
+                current.append(argument)
+                yield ("debate_entry", self._rehydrate_entry(dict(argument), available_options))
+            arguments.extend(current)
+            # Agents only see the round before theirs; an empty round keeps the last one
+            previous = current or previous
+
+        prompt = self._build_synthesis_prompt(trip_context, available_options, num_days, arguments)
+        streamer = JsonArrayStreamer(("itinerary",))
+        streamed_days = 0
+
+        try:
+            with track_upstream("debate_synthesis"):
+                stream = create_json_completion(
+                    self.client,
+                    model=self.model,
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=1500,
+                    stream=True,
+                )
+
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    for _, item in streamer.feed(chunk.choices[0].delta.content or ""):
+                        day = validate_item(ItineraryDay, item)
+                        if day is not None:
+                            streamed_days += 1
+                            yield ("itinerary_day", self._rehydrate_day(day, available_options))
+
+            log_llm_usage("debate_synthesis", prompt, completion=streamer.buffer)
+            result = self._parse_result(streamer.buffer.strip(), available_options)
+
+        except Exception as e:
+            print(f"❌ Debate synthesis error: {e}")
+            if arguments or streamed_days:
+                yield ("debate_error", self.INTERRUPTED_MESSAGE)
+            if streamed_days:
+                result = self._interrupted_result(streamer.buffer, available_options)
+            else:
+                result = self._safe_fallback(available_options)
+
+        if arguments:
+            result["debate_transcript"] = [
+                self._rehydrate_entry(dict(argument), available_options) for argument in arguments
+            ]
+        yield ("result", result)
+
+    def _run_round(self, round_number: int, trip_context: dict, available_options: dict, previous):
+        """Yield each agent's argument as it completes; stop waiting at the round deadline"""
+        futures = {
+            _AGENT_POOL.submit(self._argue, debater, trip_context, available_options, previous): debater
+            for debater in self.debaters
+        }
+        try:
+            for future in as_completed(futures, timeout=self.round_deadline):
+                debater = futures[future]
+                try:
+                    argument = future.result()
+                except Exception as e:
+                    print(f"⚠️ {debater.persona['name']} failed in round {round_number}: {e}")
+                    continue
+                if isinstance(argument, dict):
+                    argument["agent"] = debater.persona["name"]
+                    argument["round"] = round_number
+                    yield argument
+        except TimeoutError:
+            late = [debater for future, debater in futures.items() if not future.done()]
+            for future in futures:
+                future.cancel()
+            for debater in late:
+                UPSTREAM_ERRORS.inc(call=f"debate_{debater.agent_type}")
+            print(f"⏱️ Round {round_number}: dropped {', '.join(d.persona['name'] for d in late)} "
+                  f"after {self.round_deadline:g}s")
+
+    @staticmethod
+    def _argue(debater: AgentDebater, trip_context: dict, available_options: dict, previous):
+        with track_upstream(f"debate_{debater.agent_type}"):
+            return debater.make_argument(trip_context, available_options, previous)
+
+    def _build_synthesis_prompt(self, trip_context: dict, available_options: dict, num_days: int,
+                                arguments: list) -> str:
+        return f"""You are the coordinator of a travel planning debate. The agents have argued; now decide.
+
+Trip Context:
+{compact_json(trip_context)}
+
+Available Options:
+{format_options(available_options)}
+
+Agent arguments:
+{compact_json(arguments) if arguments else "No arguments (agents unavailable); decide from the trip context."}
+
+Number of days: {num_days}
+{self._day_plan_text(available_options.get("activities", []), num_days)}
+Weigh the arguments against the trip context, pick one flight, one hotel and the activities,
+and create a {num_days}-day itinerary with exactly 3 slots per day: morning (9:00 AM),
+afternoon (1:00 PM), evening (6:00 PM).
+
+Refer to every flight, hotel and activity ONLY by its "id". Never copy option details.
+
+Return ONLY valid JSON, no markdown fences, no extra text:
+
+{{
+  "final_decision": {{
+    "flight_id": "flight id",
+    "hotel_id": "hotel id",
+    "activity_ids": ["activity id"],
+    "itinerary": [
+      {{
+        "day": 1,
+        "date": "{trip_context.get('start_date', '')}",
+        "theme": "Arrival & Exploration",
+        "schedule": [
+          {{"time_slot": "morning", "time": "9:00 AM", "activity_id": "activity id", "tips": "Short tip"}},
+          {{"time_slot": "afternoon", "time": "1:00 PM", "activity_id": "activity id", "tips": "Short tip"}},
+          {{"time_slot": "evening", "time": "6:00 PM", "activity_id": "activity id", "tips": "Short tip"}}
+        ]
+      }}
+    ],
+    "reasoning": "2-3 sentence explanation of choices.",
+    "key_tradeoffs": "What was balanced between agents."
+  }}
+}}
+
+Create {num_days} day entries in itinerary (not just 1).
+"""
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+from models.offers import to_wire
+from utils.ttl_cache import TTLCache
+
+
+class DebateResultCache:
+    """
+    Content-addressed cache of finished debates.
+    The key hashes the canonical trip context (budget bucketed into bands) and
+    the content of the debated options, so identical trips (another user, a
+    repeated finalize, a reconnect) reuse the result instead of a new LLM call.
+    """
+
+    def __init__(self, max_entries: int = None, ttl_seconds: float = None, budget_band: int = None):
+        self.cache = TTLCache(
+            "debate_result",
+            max_entries=max_entries or int(os.getenv("DEBATE_CACHE_MAX_ENTRIES", "500")),
+            ttl_seconds=ttl_seconds or float(os.getenv("DEBATE_CACHE_TTL_SECONDS", "21600"))
+        )
+        self.budget_band = budget_band or int(os.getenv("DEBATE_CACHE_BUDGET_BAND", "10000"))
+
+    def key(self, trip_context: dict, available_options: dict, engine: str = "") -> str:
+        canonical = {
+            "departure_city": self._text(trip_context.get("departure_city")),
+            "destination": self._text(trip_context.get("destination")),
+            "start_date": trip_context.get("start_date") or "",
+            "end_date": trip_context.get("end_date") or "",
+            "budget_band": self._budget_band(trip_context.get("budget")),
+            "persona": self._text(trip_context.get("persona")),
+            "flights": [self._digest(option) for option in available_options.get("flights", [])],
+            "hotels": [self._digest(option) for option in available_options.get("hotels", [])],
+            # Selection order does not change the trip
+            "activities": sorted(self._digest(option) for option in available_options.get("activities", [])),
+            "engine": engine,
+        }
+        encoded = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode()).hexdigest()
+
+    def get(self, key: str):
+        return self.cache.lookup(key)
+
+    def set(self, key: str, result: dict):
+        """Store a debate result; fallback and truncated results are not worth reusing"""
+        if result and not result.get("fallback") and not result.get("partial"):
+            self.cache.set(key, result)
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "budget_band": self.budget_band}
+
+    def _budget_band(self, budget):
+        try:
+            return int(float(budget)) // self.budget_band
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _text(value) -> str:
+        return str(value or "").strip().lower()
+
+    @staticmethod
+    def _digest(option) -> str:
+        """
+        Hash of the option's full content. Offer IDs are only unique within one
+        upstream response (Amadeus numbers offers "1", "2", ...; GPLACE_NNN is a
+        list position), so they cannot identify a flight, hotel price or place.
+        """
+        encoded = json.dumps(to_wire(option), sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.sha256(encoded.encode()).hexdigest()
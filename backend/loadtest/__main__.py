@@ -0,0 +1,122 @@
+"""
+Offline load test: local stand-ins for Azure OpenAI, Amadeus and Google Places,
+the API under test in a uvicorn subprocess, and N simulated websocket users.
+
+    cd backend
+    python -m loadtest --users 100 --workers 1 --llm-latency-ms 600 --error-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from loadtest.driver import format_report, run_load
+from loadtest.fake_upstreams import (
+    FakeAmadeusHandler, FakeAzureOpenAIHandler, FakePlacesHandler, LatencyProfile, start_fake_server
+)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Offline load test for the travel planner API")
+    parser.add_argument("--users", type=int, default=20, help="concurrent simulated websocket users")
+    parser.add_argument("--ramp-seconds", type=float, default=0.0, help="spread user start-up over this window")
+    parser.add_argument("--timeout", type=float, default=180.0, help="per-message receive timeout")
+    parser.add_argument("--target", help="ws:// URL of an already running server (skips starting one)")
+    parser.add_argument("--port", type=int, default=8765, help="port for the API under test")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the API under test")
+    parser.add_argument("--llm-latency-ms", type=float, default=500, help="median Azure OpenAI time-to-first-byte")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=400, help="fake generation speed")
+    parser.add_argument("--amadeus-latency-ms", type=float, default=300, help="median Amadeus latency")
+    parser.add_argument("--places-latency-ms", type=float, default=200, help="median Google Places latency")
+    parser.add_argument("--sigma", type=float, default=0.4, help="log-normal spread of all latencies")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls that fail")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    return parser.parse_args()
+
+
+def start_upstreams(args) -> dict:
+    FakeAzureOpenAIHandler.tokens_per_second = args.llm_tokens_per_second
+    servers = {
+        "azure": start_fake_server(FakeAzureOpenAIHandler,
+                                   LatencyProfile(args.llm_latency_ms, args.sigma, args.error_rate)),
+        "amadeus": start_fake_server(FakeAmadeusHandler,
+                                     LatencyProfile(args.amadeus_latency_ms, args.sigma, args.error_rate)),
+        "places": start_fake_server(FakePlacesHandler,
+                                    LatencyProfile(args.places_latency_ms, args.sigma, args.error_rate)),
+    }
+    for name, server in servers.items():
+        print(f"🧪 Fake {name} listening on port {server.server_address[1]}")
+    return servers
+
+
+def start_api(args, servers: dict) -> subprocess.Popen:
+    # Fake upstream results must never land in the real cache.db / sessions.db
+    state_dir = tempfile.mkdtemp(prefix="loadtest-")
+    env = dict(os.environ)
+    env.update({
+        "CACHE_DB_PATH": os.path.join(state_dir, "cache.db"),
+        "SESSION_SQLITE_PATH": os.path.join(state_dir, "sessions.db"),
+        "AZURE_OPENAI_ENDPOINT": f"http://127.0.0.1:{servers['azure'].server_address[1]}",
+        "AZURE_OPENAI_API_KEY": "loadtest",
+        "AZURE_OPENAI_API_VERSION": "2024-02-01",
+        "AZURE_OPENAI_DEPLOYMENT": "loadtest",
+        "AMADEUS_API_KEY": "loadtest",
+        "AMADEUS_API_SECRET": "loadtest",
+        "AMADEUS_HOST": "127.0.0.1",
+        "AMADEUS_PORT": str(servers["amadeus"].server_address[1]),
+        "AMADEUS_SSL": "false",
+        "GOOGLE_PLACES_API_KEY": "loadtest",
+        "GOOGLE_PLACES_BASE_URL": f"http://127.0.0.1:{servers['places'].server_address[1]}/v1",
+    })
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API under test exited during start-up")
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{args.port}/", timeout=1)
+            print(f"🚀 API under test running on port {args.port} ({args.workers} worker(s))")
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API under test did not become ready within 30s")
+
+
+def main():
+    args = parse_args()
+    process = None
+    servers = {}
+    try:
+        if args.target:
+            url = args.target
+        else:
+            servers = start_upstreams(args)
+            process = start_api(args, servers)
+            url = f"ws://127.0.0.1:{args.port}/ws/voice"
+
+        print(f"👥 Running {args.users} simulated users against {url}...")
+        report = asyncio.run(run_load(url, args.users, args.ramp_seconds, args.timeout))
+        print(json.dumps(report, indent=2) if args.json else format_report(report))
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        for server in servers.values():
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import time
+
+import websockets
+
+# Messages walking the ConversationManager stages: greeting → departure → destination → dates → budget
+USER_SCRIPT = [
+    "Hi, I'm travelling from Bangalore",
+    "I want to go to Goa",
+    "Leaving on 2026-03-15",
+    "5 days",
+    "My budget is 50000",
+]
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class SimulatedUser:
+    """One websocket user walking the full greeting → finalize flow"""
+
+    def __init__(self, url: str, timings: dict, timeout: float):
+        self.url = url
+        self.timings = timings
+        self.timeout = timeout
+        self.messages = 0
+
+    async def run(self):
+        async with websockets.connect(self.url, max_size=None) as ws:
+            await self._wait_for(ws, "session")
+
+            for i, text in enumerate(USER_SCRIPT):
+                await self._step(ws, f"chat_{i + 1}", {"type": "user_message", "message": text}, "bot_response")
+
+            flights = await self._wait_for(ws, "show_options", "flights_shown")
+            hotels = await self._step(ws, "select_flight",
+                                      {"type": "select_flight", "flight": flights["options"][0]},
+                                      "show_options", options_type="hotels")
+            activities = await self._step(ws, "select_hotel",
+                                          {"type": "select_hotel", "hotel": hotels["options"][0]},
+                                          "show_options", options_type="activities")
+            for activity in activities["options"][:2]:
+                await self._step(ws, "select_activity", {"type": "select_activity", "activity": activity},
+                                 "bot_response")
+            await self._step(ws, "finalize", {"type": "finalize"}, "planning_result")
+
+    async def _step(self, ws, name: str, message: dict, expect: str, **match):
+        start = time.perf_counter()
+        await ws.send(json.dumps(message))
+        self.messages += 1
+        return await self._wait_for(ws, expect, name, start, **match)
+
+    async def _wait_for(self, ws, expect: str, name: str = None, start: float = None, **match):
+        start = start or time.perf_counter()
+        while True:
+            data = json.loads(await asyncio.wait_for(ws.recv(), self.timeout))
+            self.messages += 1
+            if data.get("type") == expect and all(data.get(k) == v for k, v in match.items()):
+                if name:
+                    self.timings.setdefault(name, []).append(time.perf_counter() - start)
+                return data
+
+
+async def run_load(url: str, users: int, ramp_seconds: float = 0.0, timeout: float = 180.0) -> dict:
+    """Run `users` concurrent simulated users against url; returns a report dict"""
+    timings = {}
+    errors = {}
+    simulated = []
+
+    async def one(i: int):
+        if ramp_seconds:
+            await asyncio.sleep(ramp_seconds * i / users)
+        user = SimulatedUser(url, timings, timeout)
+        simulated.append(user)
+        start = time.perf_counter()
+        try:
+            await user.run()
+            timings.setdefault("session_total", []).append(time.perf_counter() - start)
+        except Exception as e:
+            key = type(e).__name__
+            errors[key] = errors.get(key, 0) + 1
+
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(users)))
+    wall = time.perf_counter() - wall_start
+
+    completed = len(timings.get("session_total", []))
+    return {
+        "users": users,
+        "completed": completed,
+        "errors": errors,
+        "wall_seconds": round(wall, 2),
+        "sessions_per_second": round(completed / wall, 2) if wall else 0,
+        "messages_per_second": round(sum(u.messages for u in simulated) / wall, 1) if wall else 0,
+        "latency_ms": {
+            step: {
+                "p50": round(percentile(values, 50) * 1000, 1),
+                "p90": round(percentile(values, 90) * 1000, 1),
+                "p99": round(percentile(values, 99) * 1000, 1),
+                "max": round(max(values) * 1000, 1),
+            }
+            for step, values in timings.items()
+        },
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        "=" * 70,
+        f"👥 Users: {report['users']}   ✅ Completed: {report['completed']}   ❌ Errors: {report['errors'] or 0}",
+        f"⏱️ Wall time: {report['wall_seconds']}s   "
+        f"🔁 {report['sessions_per_second']} sessions/s   📨 {report['messages_per_second']} msgs/s",
+        "-" * 70,
+        f"{'step':<20}{'p50 ms':>12}{'p90 ms':>12}{'p99 ms':>12}{'max ms':>12}",
+    ]
+    for step, stats in report["latency_ms"].items():
+        lines.append(f"{step:<20}{stats['p50']:>12}{stats['p90']:>12}{stats['p99']:>12}{stats['max']:>12}")
+    lines.append("=" * 70)
+    return "\n".join(lines)
@@ -0,0 +1,334 @@
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class LatencyProfile:
+    """Log-normal latency (median_ms, sigma) plus an error rate, applied per request"""
+
+    def __init__(self, median_ms: float = 200, sigma: float = 0.4, error_rate: float = 0.0):
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+
+    def sleep(self):
+        if self.median_ms > 0:
+            time.sleep(self.median_ms * math.exp(random.gauss(0, self.sigma)) / 1000)
+
+    def should_fail(self) -> bool:
+        return random.random() < self.error_rate
+
+
+class _FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    profile = LatencyProfile()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return dict(parse_qs(raw.decode()))
+
+    def _send_json(self, status: int, payload: dict, content_type: str = "application/json"):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _maybe_fail(self) -> bool:
+        self.profile.sleep()
+        if self.profile.should_fail():
+            status = random.choice((429, 500, 503))
+            self._send_json(status, {"error": {"code": status, "message": "Injected failure"}})
+            return True
+        return False
+
+
+# -----------------------------------
+# AZURE OPENAI
+# -----------------------------------
+
+def _option_ids(prompt: str) -> dict:
+    """First column of each option table in the prompt (see utils.prompting.format_options)"""
+    ids = {}
+    kind = None
+    header = False
+    for line in prompt.splitlines():
+        line = line.strip()
+        if line in ("flights:", "hotels:", "activities:"):
+            kind, header = line[:-1], True
+            ids[kind] = []
+        elif not line:
+            kind = None
+        elif kind and header:
+            header = False
+        elif kind and not line.startswith("("):
+            ids[kind].append(line.split(" | ")[0])
+    return ids
+
+
+def fake_debate_json(prompt: str) -> str:
+    days = 3
+    for line in prompt.splitlines():
+        if line.startswith("Number of days:"):
+            days = int(line.split(":")[1].strip() or 3)
+    # DEBATE_ID_ONLY prompts: answer with option IDs so the server-side rehydration is exercised
+    id_only = 'ONLY by its "id"' in prompt
+    ids = _option_ids(prompt) if id_only else {}
+    flight_ids = ids.get("flights") or [""]
+    hotel_ids = ids.get("hotels") or [""]
+    activity_ids = ids.get("activities") or []
+
+    agents = ["Budget Agent", "Luxury Agent", "Experience Agent"]
+    transcript = [
+        {
+            "agent": agent,
+            "preferred_flight": flight_ids[0],
+            "preferred_hotel": hotel_ids[0],
+            "preferred_activities": activity_ids[:2],
+            "argument": f"Round {round_no} argument from the {agent}.",
+            "counterarguments": "" if round_no == 1 else "Brief counter.",
+        }
+        for round_no in (1, 2) for agent in agents
+    ]
+    slots = (("morning", "9:00 AM"), ("afternoon", "1:00 PM"), ("evening", "6:00 PM"))
+
+    def slot(day, index, time_slot, time_):
+        if id_only:
+            activity_id = activity_ids[(day * 3 + index) % len(activity_ids)] if activity_ids else ""
+            return {"time_slot": time_slot, "time": time_, "activity_id": activity_id, "tips": "Go early."}
+        return {"time_slot": time_slot, "time": time_, "activity_name": "Local sightseeing", "location": "City centre",
+                "duration": "2 hours", "tips": "Go early.", "rating": 4.5, "opening_hours": "9 AM - 6 PM"}
+
+    itinerary = [
+        {
+            "day": day,
+            "date": "",
+            "theme": "Exploration",
+            "schedule": [slot(day, index, time_slot, time_) for index, (time_slot, time_) in enumerate(slots)],
+        }
+        for day in range(1, days + 1)
+    ]
+    if id_only:
+        decision = {"flight_id": flight_ids[0], "hotel_id": hotel_ids[0], "activity_ids": activity_ids}
+    else:
+        decision = {"flight": {}, "hotel": {}, "activities": []}
+    return json.dumps({
+        "debate_transcript": transcript,
+        "final_decision": {
+            **decision, "itinerary": itinerary,
+            "reasoning": "Balanced choice.", "key_tradeoffs": "Cost versus comfort.",
+        },
+    })
+
+
+def fake_argument_json(prompt: str) -> str:
+    agent = prompt.split("You are the ", 1)[1].split(",", 1)[0]
+    return json.dumps({
+        "agent": agent,
+        "preferred_flight": "",
+        "preferred_hotel": "",
+        "preferred_activities": [],
+        "argument": f"Argument from the {agent}.",
+        "counterarguments": "",
+    })
+
+
+class FakeAzureOpenAIHandler(_FakeHandler):
+    """POST /openai/deployments/{deployment}/chat/completions (stream and non-stream)"""
+
+    tokens_per_second = 400.0
+
+    def do_POST(self):
+        if "/chat/completions" not in self.path:
+            return self._send_json(404, {"error": {"message": "Not found"}})
+        request = self._body()
+        if self._maybe_fail():
+            return
+
+        prompt = request.get("messages", [{}])[-1].get("content", "")
+        if "a specialist travel agent" in prompt:
+            content = fake_argument_json(prompt)
+        elif "debate" in prompt.lower():
+            content = fake_debate_json(prompt)
+        else:
+            content = "Sounds great! Tell me a little more about your trip."
+        completion_tokens = max(1, len(content) // 4)
+        base = {"id": f"chatcmpl-{uuid.uuid4().hex[:12]}", "created": int(time.time()), "model": "fake-gpt"}
+
+        if not request.get("stream"):
+            time.sleep(completion_tokens / self.tokens_per_second)
+            return self._send_json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": content}}],
+                "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": completion_tokens,
+                          "total_tokens": len(prompt) // 4 + completion_tokens},
+            })
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chunk_chars = 16
+        for i in range(0, len(content), chunk_chars):
+            time.sleep(chunk_chars / 4 / self.tokens_per_second)
+            self._write_event({**base, "object": "chat.completion.chunk",
+                               "choices": [{"index": 0, "finish_reason": None,
+                                            "delta": {"content": content[i:i + chunk_chars]}}]})
+        self._write_event({**base, "object": "chat.completion.chunk",
+                           "choices": [{"index": 0, "finish_reason": "stop", "delta": {}}]})
+        self._write_chunk(b"data: [DONE]\n\n")
+        self._write_chunk(b"")
+
+    def _write_event(self, payload: dict):
+        self._write_chunk(f"data: {json.dumps(payload)}\n\n".encode())
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+
+# -----------------------------------
+# AMADEUS
+# -----------------------------------
+
+class FakeAmadeusHandler(_FakeHandler):
+    """OAuth token, flight offers, hotels by city and hotel offers"""
+
+    hotels_per_city = 40
+
+    def do_POST(self):
+        if self.path.startswith("/v1/security/oauth2/token"):
+            self._body()
+            return self._send_json(200, {"access_token": uuid.uuid4().hex, "expires_in": 1799,
+                                         "token_type": "Bearer"})
+        self._send_json(404, {"errors": [{"detail": "Not found"}]})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if self._maybe_fail():
+            return
+
+        if url.path == "/v2/shopping/flight-offers":
+            data = [self._flight_offer(i, params) for i in range(int(params.get("max", 5)))]
+        elif url.path == "/v1/reference-data/locations/hotels/by-city":
+            city = params.get("cityCode", "XXX")
+            data = [{"hotelId": f"{city}{i:05d}", "name": f"Hotel {i}", "iataCode": city}
+                    for i in range(self.hotels_per_city)]
+        elif url.path == "/v3/shopping/hotel-offers":
+            data = [self._hotel_offer(hotel_id, params) for hotel_id in params.get("hotelIds", "").split(",")
+                    if hotel_id and random.random() < 0.8]
+        else:
+            return self._send_json(404, {"errors": [{"detail": "Not found"}]})
+
+        self._send_json(200, {"data": data}, content_type="application/vnd.amadeus+json")
+
+    def _flight_offer(self, i: int, params: dict) -> dict:
+        date = params.get("departureDate", "2026-03-15")
+        return {
+            "id": str(i + 1),
+            "price": {"total": f"{random.uniform(40, 200):.2f}", "currency": "EUR"},
+            "itineraries": [{
+                "duration": "PT2H15M",
+                "segments": [{
+                    "departure": {"iataCode": params.get("originLocationCode"), "at": f"{date}T0{i % 10}:00:00"},
+                    "arrival": {"iataCode": params.get("destinationLocationCode"), "at": f"{date}T1{i % 10}:15:00"},
+                    "carrierCode": random.choice(["AI", "6E", "UK", "SG"]),
+                    "aircraft": {"code": "320"},
+                }],
+            }],
+            "travelerPricings": [{"fareDetailsBySegment": [{"cabin": "ECONOMY"}]}],
+        }
+
+    def _hotel_offer(self, hotel_id: str, params: dict) -> dict:
+        return {
+            "hotel": {"hotelId": hotel_id, "name": f"Fake Hotel {hotel_id}", "rating": "4",
+                      "amenities": ["WIFI", "POOL"]},
+            "offers": [{"price": {"total": f"{random.uniform(50, 300):.2f}", "currency": "EUR"},
+                        "room": {"typeEstimated": {"category": "STANDARD_ROOM"}}}],
+        }
+
+
+# -----------------------------------
+# GOOGLE PLACES
+# -----------------------------------
+
+class FakePlacesHandler(_FakeHandler):
+    """
+    POST /v1/places:searchText (pageSize / pageToken pagination over 60 results, like the real API)
+    GET  /v1/places/{id}        (place details)
+    """
+
+    total_results = 60
+
+    def do_GET(self):
+        if not self.path.startswith("/v1/places/"):
+            return self._send_json(404, {"error": {"message": "Not found"}})
+        if self._maybe_fail():
+            return
+        place_id = self.path[len("/v1/places/"):].split("?")[0]
+        self._send_json(200, {
+            "id": place_id,
+            "rating": round(random.uniform(3.8, 4.9), 1),
+            "userRatingCount": random.randint(50, 5000),
+            "regularOpeningHours": {"openNow": True, "weekdayDescriptions": ["Monday: 9 AM - 6 PM",
+                                                                           "Tuesday: 9 AM - 6 PM"]},
+            "photos": [{"name": f"places/{place_id}/photos/p{i}", "widthPx": 1600} for i in range(4)],
+        })
+
+    def do_POST(self):
+        if not self.path.startswith("/v1/places:searchText"):
+            return self._send_json(404, {"error": {"message": "Not found"}})
+        request = self._body()
+        if self._maybe_fail():
+            return
+        count = int(request.get("pageSize", request.get("maxResultCount", 10)))
+        token = request.get("pageToken", "")
+        if token and not token.startswith("offset-"):
+            return self._send_json(400, {"error": {"message": "Invalid page token"}})
+        start = int(token[len("offset-"):]) if token else 0
+        end = min(start + count, self.total_results)
+        places = [
+            {
+                "id": f"place{i}",
+                "displayName": {"text": f"Attraction {i + 1}"},
+                "formattedAddress": f"{i + 1} Main Road",
+                "rating": round(random.uniform(3.8, 4.9), 1),
+                "userRatingCount": random.randint(100, 50000),
+                "primaryTypeDisplayName": {"text": "Tourist attraction"},
+                "regularOpeningHours": {"weekdayDescriptions": ["Monday: 9 AM - 6 PM"]},
+                "location": {"latitude": 15.5 + random.uniform(-0.2, 0.2),
+                             "longitude": 73.8 + random.uniform(-0.2, 0.2)},
+            }
+            for i in range(start, end)
+        ]
+        body = {"places": places}
+        if end < self.total_results:
+            body["nextPageToken"] = f"offset-{end}"
+        self._send_json(200, body)
+
+
+def start_fake_server(handler_cls, profile: LatencyProfile, host: str = "127.0.0.1", port: int = 0):
+    """Start a fake upstream on a daemon thread; returns the server (server.server_address has the port)"""
+    handler = type(handler_cls.__name__, (handler_cls,), {"profile": profile})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -1,16 +1,30 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel
+import asyncio
 import json
 import os
 from dotenv import load_dotenv
-from openai import AzureOpenAI
 import traceback
+import uuid
 
 from conversation.conversation_manager import ConversationManager
+from conversation.session_store import SessionStore
 from debate.debate_coordinator import DebateCoordinator
+from debate.parallel_debate import ParallelDebateCoordinator
+from debate.result_cache import DebateResultCache
+from models.offers import Activity, FlightOffer, HotelOffer, to_wire, wire_default
 from services.amadeus_service import AmadeusService
 from services.google_places_service import GooglePlacesService  # ✅ NEW
+from services.llm_client import get_llm_client, close_llm_clients
+from utils.executor import UpstreamExecutor
+from utils.cursor import PagedCursor
+from utils.prefetch import OptionPrefetcher
+from utils.mock_inventory import inventory
+from utils.metrics import (
+    REGISTRY, Gauge, ACTIVE_WEBSOCKETS, WEBSOCKET_MESSAGES, OPTION_FETCHES, MOCK_FALLBACKS
+)
 
 load_dotenv()
 
@@ -24,11 +38,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-azure_client = AzureOpenAI(
-    api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-    api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
-    azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT")
-)
+azure_client = get_llm_client()
 
 print("🔧 Initializing Amadeus Service...")
 amadeus_service = AmadeusService()
@@ -38,7 +48,32 @@ print("🔧 Initializing Google Places Service...")
 google_places_service = GooglePlacesService()  # ✅ NEW
 print("✅ Google Places Service initialized\n")
 
-conversations = {}
+print("🔧 Initializing upstream executor...")
+upstream = UpstreamExecutor()
+print(f"✅ Upstream executor ready ({upstream.max_workers} workers)\n")
+
+DEBATE_TIMEOUT_SECONDS = float(os.getenv("DEBATE_TIMEOUT_SECONDS", "120"))
+DEBATE_STREAMING = os.getenv("DEBATE_STREAMING", "1") != "0"
+DEBATE_ENGINE = os.getenv("DEBATE_ENGINE", "single")  # single | parallel
+FLEX_SEARCH_DEFAULT_DAYS = int(os.getenv("FLEX_SEARCH_DEFAULT_DAYS", "2"))
+FLEX_SEARCH_MAX_DAYS = int(os.getenv("FLEX_SEARCH_MAX_DAYS", "3"))
+TRIP_TOP_K = int(os.getenv("TRIP_TOP_K", "5"))
+MAX_TRIP_LEGS = int(os.getenv("MAX_TRIP_LEGS", "6"))
+ACTIVITY_PAGE_SIZE = int(os.getenv("ACTIVITY_PAGE_SIZE", "8"))
+
+conversations = SessionStore(lambda: ConversationManager(azure_client))
+debate_cache = DebateResultCache()
+debate_inflight = {}  # cache key -> Future of the debate currently running for it
+
+Gauge(
+    "travel_live_sessions", "Sessions held in this process's session store",
+    callback=lambda: {(): len(conversations)}
+)
+Gauge(
+    "travel_executor_tasks", "Upstream executor tasks by state",
+    labels=("state",),
+    callback=lambda: {(state,): upstream.stats()[state] for state in ("active", "queued")}
+)
 
 
 class ChatMessage(BaseModel):
@@ -46,20 +81,237 @@ class ChatMessage(BaseModel):
     session_id: str
 
 
+def to_json(payload) -> str:
+    """json.dumps for websocket payloads that may carry offer records"""
+    return json.dumps(payload, default=wire_default)
+
+
+def bounded_int(value, default: int, low: int, high: int) -> int:
+    """Client-supplied integer clamped to [low, high]; default when it is not a number"""
+    try:
+        return max(low, min(int(value), high))
+    except (TypeError, ValueError):
+        return default
+
+
+def activity_key(activity) -> str:
+    """Dedupe key for activities: GPLACE_NNN ids are list positions, the Places id is stable"""
+    return activity.place_id or activity.id
+
+
+def mark_shown(shown: tuple, destination: str, options: list) -> tuple:
+    """(destination, activity keys already sent); a new destination starts a fresh set"""
+    if shown[0] != destination:
+        shown = (destination, set())
+    shown[1].update(activity_key(option) for option in options)
+    return shown
+
+
 def load_mock_activities(destination: str) -> list:
-    """Load mock activities filtered by destination city name"""
+    """Mock activities for a destination (all activities if the city is unknown)"""
+    return inventory.activities(destination)
+
+
+def load_mock_hotels(destination: str) -> list:
+    """Mock hotels for a destination IATA code"""
+    return inventory.hotels(destination)
+
+
+def load_mock_flights(departure_city: str, destination: str) -> list:
+    """Mock flights on the route (whole catalogue if the route is unknown)"""
+    return inventory.flights(departure_city, destination)
+
+
+async def fetch_flight_options(collected: dict) -> list:
+    """Amadeus flights first, mock fallback"""
     try:
-        with open('data/mock_activities.json', 'r') as f:
-            mock_data = json.load(f)
-            all_activities = mock_data.get('activities', [])
-            filtered = [
-                a for a in all_activities
-                if a.get('location', '').lower() == destination.lower()
-            ]
-            return filtered if filtered else all_activities
-    except Exception as e:
-        print(f"❌ Error loading mock activities: {e}")
-        return []
+        flights_data = await upstream.run(
+            amadeus_service.search_flights,
+            departure_city=collected['departure_city'],
+            destination=collected['destination'],
+            departure_date=collected['start_date'],
+            max_results=3
+        )
+    except asyncio.TimeoutError:
+        flights_data = {"error": "Amadeus flight search timed out"}
+
+    OPTION_FETCHES.inc(kind='flights')
+    if 'error' not in flights_data:
+        options = flights_data.get('flights', [])[:3]
+        print(f"✈️ Found {len(options)} flights")
+    else:
+        MOCK_FALLBACKS.inc(kind='flights')
+        print(f"⚠️ Amadeus failed ({flights_data['error']}), using mock flights")
+        mock = load_mock_flights(collected['departure_city'], collected['destination'])[:3]
+        options = [FlightOffer.from_wire(flight) for flight in mock]
+    return options
+
+
+async def fetch_flexible_flights(collected: dict, flex_days: int) -> dict:
+    """Amadeus flights across start_date ± flex_days with a cheapest-fare calendar"""
+    flex_days = bounded_int(flex_days, FLEX_SEARCH_DEFAULT_DAYS, 0, FLEX_SEARCH_MAX_DAYS)
+    try:
+        return await upstream.run(
+            amadeus_service.search_flights_flexible,
+            departure_city=collected['departure_city'],
+            destination=collected['destination'],
+            departure_date=collected['start_date'],
+            flex_days=flex_days,
+            max_results=3
+        )
+    except asyncio.TimeoutError:
+        return {"error": "Amadeus flexible search timed out", "fare_calendar": [], "cheapest_date": None}
+
+
+async def fetch_trip_options(collected: dict, mode: str, legs: list = None) -> dict:
+    """Round-trip (start_date out, end_date back) or multi-city itineraries from Amadeus"""
+    try:
+        if mode == 'multi_city':
+            return await upstream.run(
+                amadeus_service.search_multi_city,
+                [(leg['from'], leg['to'], leg['date']) for leg in legs or []],
+                max_results=5, top_k=TRIP_TOP_K
+            )
+        return await upstream.run(
+            amadeus_service.search_round_trip,
+            departure_city=collected['departure_city'],
+            destination=collected['destination'],
+            departure_date=collected['start_date'],
+            return_date=collected['end_date'],
+            max_results=5, top_k=TRIP_TOP_K
+        )
+    except asyncio.TimeoutError:
+        return {"error": "Amadeus itinerary search timed out"}
+
+
+async def fetch_hotel_options(collected: dict) -> list:
+    """Amadeus hotels first, mock fallback"""
+    try:
+        hotels_data = await upstream.run(
+            amadeus_service.search_hotels,
+            city=collected['destination'],
+            check_in_date=collected['start_date'],
+            check_out_date=collected['end_date']
+        )
+    except asyncio.TimeoutError:
+        hotels_data = {"error": "Amadeus hotel search timed out"}
+
+    OPTION_FETCHES.inc(kind='hotels')
+    if 'error' not in hotels_data:
+        options = hotels_data.get('hotels', [])[:5]
+        print(f"🏨 Found {len(options)} hotels")
+    else:
+        MOCK_FALLBACKS.inc(kind='hotels')
+        print(f"⚠️ Amadeus failed ({hotels_data['error']}), using mock hotels")
+        options = [HotelOffer.from_wire(hotel) for hotel in load_mock_hotels(collected['destination'])[:5]]
+    return options
+
+
+async def fetch_activity_options(collected: dict) -> list:
+    """Google Places first, mock fallback"""
+    print(f"🌍 Searching Google Places for {collected['destination']}...")
+    try:
+        activities_data = await asyncio.wait_for(
+            google_places_service.search_activities_async(city=collected['destination'], max_results=10),
+            upstream.default_timeout
+        )
+    except asyncio.TimeoutError:
+        activities_data = {"error": "Google Places request timed out"}
+
+    OPTION_FETCHES.inc(kind='activities')
+    if 'error' not in activities_data:
+        options = activities_data.get('activities', [])[:8]
+        print(f"✅ Google Places: {len(options)} activities")
+    else:
+        MOCK_FALLBACKS.inc(kind='activities')
+        print(f"❌ Google Places error: {activities_data.get('error')}")
+        print("⚠️ Using mock activities")
+        options = [Activity.from_wire(activity) for activity in load_mock_activities(collected['destination'])[:8]]
+    return options
+
+
+def activity_pages(destination: str):
+    """Pages for the "more activities" cursor: Places (same page size as the first search), else mock"""
+    served = False
+    for page in google_places_service.iter_activities(destination, page_size=10):
+        served = True
+        yield page
+    if not served:
+        yield [Activity.from_wire(activity) for activity in load_mock_activities(destination)]
+
+
+async def run_debate(websocket: WebSocket, trip_context: dict, available_options: dict, stream: bool,
+                     engine: str = DEBATE_ENGINE, regenerate: bool = False) -> dict:
+    """
+    Run the debate + itinerary. In streaming mode every transcript entry and
+    itinerary day is pushed to the client as soon as it is complete; the caller
+    still sends the consolidated planning_result at the end.
+    engine "single" simulates all agents in one LLM call; "parallel" runs one
+    call per agent per round plus a short synthesis call.
+    Identical trips are answered from debate_cache unless regenerate is set.
+    """
+    # Client-supplied: anything but "parallel" runs (and is cached as) the single-call engine
+    engine = 'parallel' if str(engine or '').strip().lower() == 'parallel' else 'single'
+    cache_key = debate_cache.key(trip_context, available_options, engine)
+    if not regenerate:
+        cached = debate_cache.get(cache_key)
+        if cached is None and cache_key in debate_inflight:
+            # The same trip is being debated right now (another user, a repeated finalize): share it
+            cached = await asyncio.shield(debate_inflight[cache_key])
+        if cached is not None:
+            print("♻️ Reusing cached debate result")
+            if stream:
+                for entry in cached['debate_transcript']:
+                    await websocket.send_text(to_json({'type': 'debate_entry', 'entry': entry}))
+                for day in cached['final_decision'].get('itinerary', []):
+                    await websocket.send_text(to_json({'type': 'itinerary_day', 'day': day}))
+            return cached
+
+    if engine == 'parallel':
+        debate_coordinator = ParallelDebateCoordinator(azure_client)
+    else:
+        debate_coordinator = DebateCoordinator(azure_client)
+
+    inflight = asyncio.get_running_loop().create_future()
+    debate_inflight.setdefault(cache_key, inflight)
+    debate_result = None
+    try:
+        if not stream:
+            debate_result = await upstream.run(
+                debate_coordinator.conduct_debate, trip_context, available_options,
+                timeout=DEBATE_TIMEOUT_SECONDS
+            )
+        else:
+            async for event, payload in upstream.stream(
+                debate_coordinator.conduct_debate_stream, trip_context, available_options,
+                timeout=DEBATE_TIMEOUT_SECONDS
+            ):
+                if event == 'result':
+                    debate_result = payload
+                elif event == 'debate_entry':
+                    await websocket.send_text(to_json({'type': 'debate_entry', 'entry': payload}))
+                elif event == 'itinerary_day':
+                    await websocket.send_text(to_json({'type': 'itinerary_day', 'day': payload}))
+                elif event == 'debate_error':
+                    # Entries already on screen stay; the planning_result that follows is marked partial
+                    await websocket.send_text(to_json({'type': 'debate_error', 'message': payload}))
+
+        debate_cache.set(cache_key, debate_result)
+        return debate_result
+    finally:
+        # Waiters get None on failure and run their own debate
+        if debate_inflight.get(cache_key) is inflight:
+            del debate_inflight[cache_key]
+        inflight.set_result(debate_result)
+
+
+def create_prefetcher() -> OptionPrefetcher:
+    """Options are fetched in the background as soon as their inputs are known"""
+    return OptionPrefetcher({
+        'flights': (fetch_flight_options, ('departure_city', 'destination', 'start_date')),
+        'hotels': (fetch_hotel_options, ('destination', 'start_date', 'end_date')),
+        'activities': (fetch_activity_options, ('destination',)),
+    })
 
 
 @app.get("/")
@@ -67,23 +319,47 @@ def root():
     return {
         "status": "Travel Planner API is running",
         "version": "4.0",
-        "endpoints": {"chat": "/api/chat", "websocket": "/ws/voice"}
+        "endpoints": {"chat": "/api/chat", "websocket": "/ws/voice", "stats": "/api/stats", "metrics": "/metrics"}
+    }
+
+
+@app.get("/api/stats")
+def stats():
+    return {
+        "executor": upstream.stats(),
+        "sessions": conversations.stats(),
+        "flight_cache": amadeus_service.flight_cache.stats(),
+        "hotel_list_cache": amadeus_service.hotel_list_cache.stats(),
+        "places_cache": google_places_service.places_cache.stats(),
+        "place_details_cache": google_places_service.details_cache.stats(),
+        "debate_cache": debate_cache.stats()
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    upstream.shutdown()
+    close_llm_clients()
+    google_places_service.close()
+    await google_places_service.aclose()
+
+
 @app.post("/api/chat")
 async def chat(data: ChatMessage):
-    session_id = data.session_id
-    if session_id not in conversations:
-        conversations[session_id] = ConversationManager()
-    conv_manager = conversations[session_id]
     try:
-        response = conv_manager.process_message(data.message)
-        return {
+        conv_manager = await upstream.run(conversations.get_or_create, data.session_id)
+        response = await upstream.run(conv_manager.process_message, data.message)
+        await upstream.run(conversations.save, data.session_id, conv_manager)
+        return to_wire({
             "response": response,
             "collected_info": conv_manager.get_collected_info(),
             "is_complete": conv_manager.is_complete()
-        }
+        })
     except Exception as e:
         traceback.print_exc()
         return {"response": f"Error: {str(e)}", "collected_info": {}, "is_complete": False}
@@ -94,25 +370,43 @@ async def voice_chat(websocket: WebSocket):
     await websocket.accept()
     print("✅ WebSocket connection accepted")
 
-    conv_manager = ConversationManager()
+    # Clients reconnect with ?session_id=... to resume on any worker
+    session_id = websocket.query_params.get('session_id') or uuid.uuid4().hex
+    prefetcher = None
+    shown_activities = (None, set())  # (destination, activity keys sent to this client)
+    activity_cursor = None  # (destination, PagedCursor), created on the first "more_activities"
 
+    ACTIVE_WEBSOCKETS.inc()
     try:
+        conv_manager = await upstream.run(conversations.get_or_create, session_id)
+        prefetcher = create_prefetcher()
+        prefetcher.update(conv_manager.get_collected_info())
+
+        await websocket.send_text(to_json({
+            'type': 'session',
+            'session_id': session_id,
+            'collected_info': conv_manager.get_collected_info(),
+            'current_stage': conv_manager.current_stage
+        }))
+
         while True:
             data = await websocket.receive_text()
             message_data = json.loads(data)
             print(f"\n📩 Received: {message_data}")
+            WEBSOCKET_MESSAGES.inc(type=message_data.get('type', 'unknown'))
 
             # ── USER CHAT MESSAGE ────────────────────────────────────────────
             if message_data['type'] == 'user_message':
                 user_message = message_data['message']
                 print(f"💬 User: {user_message}")
 
-                result = conv_manager.process_message(user_message)
+                result = await upstream.run(conv_manager.process_message, user_message)
+                prefetcher.update(conv_manager.get_collected_info())
 
                 print(f"🤖 Bot: {result['message']}")
                 print(f"📊 Stage: {result['current_stage']}")
 
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(to_json({
                     'type': 'bot_response',
                     'message': result['message'],
                     'collected_info': result['collected_info'],
@@ -127,21 +421,8 @@ async def voice_chat(websocket: WebSocket):
 
                     try:
                         if options_type == 'flights':
-                            flights_data = amadeus_service.search_flights(
-                                departure_city=collected['departure_city'],
-                                destination=collected['destination'],
-                                departure_date=collected['start_date'],
-                                max_results=3
-                            )
-                            if 'error' not in flights_data:
-                                options = flights_data.get('flights', [])[:3]
-                                print(f"✈️ Found {len(options)} flights")
-                            else:
-                                print("⚠️ Amadeus failed, using mock flights")
-                                with open('data/mock_flights.json', 'r') as f:
-                                    options = json.load(f).get('flights', [])[:3]
-
-                            await websocket.send_text(json.dumps({
+                            options = await prefetcher.get('flights', collected)
+                            await websocket.send_text(to_json({
                                 'type': 'show_options',
                                 'options_type': 'flights',
                                 'options': options,
@@ -149,21 +430,8 @@ async def voice_chat(websocket: WebSocket):
                             }))
 
                         elif options_type == 'hotels':
-                            hotels_data = amadeus_service.search_hotels(
-                                city=collected['destination'],
-                                check_in_date=collected['start_date'],
-                                check_out_date=collected['end_date']
-                            )
-                            if 'error' not in hotels_data:
-                                options = hotels_data.get('hotels', [])[:5]
-                                print(f"🏨 Found {len(options)} hotels")
-                            else:
-                                print("⚠️ Amadeus failed, using mock hotels")
-                                with open('data/mock_hotels.json', 'r') as f:
-                                    mock_data = json.load(f)
-                                options = mock_data.get(collected['destination'], [])[:5]
-
-                            await websocket.send_text(json.dumps({
+                            options = await prefetcher.get('hotels', collected)
+                            await websocket.send_text(to_json({
                                 'type': 'show_options',
                                 'options_type': 'hotels',
                                 'options': options,
@@ -171,20 +439,9 @@ async def voice_chat(websocket: WebSocket):
                             }))
 
                         elif options_type == 'activities':
-                            # ✅ Google Places first, mock fallback
-                            print(f"🌍 Searching Google Places for {collected['destination']}...")
-                            activities_data = google_places_service.search_activities(
-                                city=collected['destination'], max_results=10
-                            )
-                            if 'error' not in activities_data:
-                                options = activities_data.get('activities', [])[:8]
-                                print(f"✅ Google Places: {len(options)} activities")
-                            else:
-                                print(f"❌ Google Places error: {activities_data.get('error')}")
-                                print("⚠️ Using mock activities")
-                                options = load_mock_activities(collected['destination'])[:8]
-
-                            await websocket.send_text(json.dumps({
+                            options = await prefetcher.get('activities', collected)
+                            shown_activities = mark_shown(shown_activities, collected['destination'], options)
+                            await websocket.send_text(to_json({
                                 'type': 'show_options',
                                 'options_type': 'activities',
                                 'options': options,
@@ -195,13 +452,66 @@ async def voice_chat(websocket: WebSocket):
                         print(f"❌ Error fetching options: {e}")
                         traceback.print_exc()
 
+            # ── FLEXIBLE DATES — fare calendar around start_date ────────────
+            elif message_data['type'] == 'flex_search':
+                collected = conv_manager.get_collected_info()
+                if not all(collected.get(f) for f in ('departure_city', 'destination', 'start_date')):
+                    await websocket.send_text(to_json({
+                        'type': 'bot_response',
+                        'message': 'Tell me where you are flying from, where to, and when first.',
+                        'collected_info': collected,
+                        'current_stage': conv_manager.current_stage,
+                        'is_complete': conv_manager.is_complete()
+                    }))
+                else:
+                    flex_data = await fetch_flexible_flights(
+                        collected, message_data.get('flex_days', FLEX_SEARCH_DEFAULT_DAYS)
+                    )
+                    print(f"📅 Fare calendar: {len(flex_data.get('fare_calendar', []))} dates, "
+                          f"cheapest {flex_data.get('cheapest_date')}")
+                    await websocket.send_text(to_json({
+                        'type': 'fare_calendar',
+                        'calendar': flex_data.get('fare_calendar', []),
+                        'cheapest_date': flex_data.get('cheapest_date'),
+                        'options': flex_data.get('flights', [])[:3],
+                        'error': flex_data.get('error')
+                    }))
+
+            # ── ROUND-TRIP / MULTI-CITY — priced leg combinations ───────────
+            elif message_data['type'] == 'trip_search':
+                collected = conv_manager.get_collected_info()
+                mode = message_data.get('mode', 'round_trip')
+                legs = message_data.get('legs')
+                if mode == 'round_trip' and not all(
+                    collected.get(f) for f in ('departure_city', 'destination', 'start_date', 'end_date')
+                ):
+                    trip_data = {"error": "Need departure city, destination and both travel dates first"}
+                elif mode == 'multi_city' and not (
+                    isinstance(legs, list) and legs and all(
+                        isinstance(leg, dict) and all(isinstance(leg.get(f), str) and leg[f] for f in ('from', 'to', 'date'))
+                        for leg in legs
+                    )
+                ):
+                    trip_data = {"error": "Multi-city legs need from, to and date"}
+                elif mode == 'multi_city' and len(legs) > MAX_TRIP_LEGS:
+                    trip_data = {"error": f"Multi-city trips are limited to {MAX_TRIP_LEGS} legs"}
+                else:
+                    trip_data = await fetch_trip_options(collected, mode, legs)
+                print(f"🧭 {mode}: {len(trip_data.get('itineraries', []))} itineraries")
+                await websocket.send_text(to_json({
+                    'type': 'trip_options',
+                    'mode': mode,
+                    'itineraries': trip_data.get('itineraries', []),
+                    'error': trip_data.get('error')
+                }))
+
             # ── FLIGHT SELECTED ──────────────────────────────────────────────
             elif message_data['type'] == 'select_flight':
                 flight_data = message_data['flight']
                 result = conv_manager.select_flight(flight_data)
                 print(f"✈️ Flight selected: {flight_data.get('airline', 'Unknown')}")
 
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(to_json({
                     'type': 'bot_response',
                     'message': result['message'],
                     'collected_info': result['collected_info'],
@@ -212,19 +522,8 @@ async def voice_chat(websocket: WebSocket):
                 if result.get('should_show_options') == 'hotels':
                     collected = conv_manager.get_collected_info()
                     try:
-                        hotels_data = amadeus_service.search_hotels(
-                            city=collected['destination'],
-                            check_in_date=collected['start_date'],
-                            check_out_date=collected['end_date']
-                        )
-                        if 'error' not in hotels_data:
-                            options = hotels_data.get('hotels', [])[:5]
-                        else:
-                            with open('data/mock_hotels.json', 'r') as f:
-                                mock_data = json.load(f)
-                            options = mock_data.get(collected['destination'], [])[:5]
-
-                        await websocket.send_text(json.dumps({
+                        options = await prefetcher.get('hotels', collected)
+                        await websocket.send_text(to_json({
                             'type': 'show_options',
                             'options_type': 'hotels',
                             'options': options,
@@ -239,7 +538,7 @@ async def voice_chat(websocket: WebSocket):
                 result = conv_manager.select_hotel(hotel_data)
                 print(f"🏨 Hotel selected: {hotel_data.get('name', 'Unknown')}")
 
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(to_json({
                     'type': 'bot_response',
                     'message': result['message'],
                     'collected_info': result['collected_info'],
@@ -250,20 +549,9 @@ async def voice_chat(websocket: WebSocket):
                 if result.get('should_show_options') == 'activities':
                     collected = conv_manager.get_collected_info()
                     try:
-                        # ✅ Google Places first, mock fallback
-                        print(f"🌍 Searching Google Places for {collected['destination']}...")
-                        activities_data = google_places_service.search_activities(
-                            city=collected['destination'], max_results=10
-                        )
-                        if 'error' not in activities_data:
-                            options = activities_data.get('activities', [])[:8]
-                            print(f"✅ Google Places: {len(options)} activities")
-                        else:
-                            print(f"❌ Google Places error: {activities_data.get('error')}")
-                            print("⚠️ Using mock activities")
-                            options = load_mock_activities(collected['destination'])[:8]
-
-                        await websocket.send_text(json.dumps({
+                        options = await prefetcher.get('activities', collected)
+                        shown_activities = mark_shown(shown_activities, collected['destination'], options)
+                        await websocket.send_text(to_json({
                             'type': 'show_options',
                             'options_type': 'activities',
                             'options': options,
@@ -272,13 +560,40 @@ async def voice_chat(websocket: WebSocket):
                     except Exception as e:
                         print(f"❌ Error fetching activities: {e}")
 
+            # ── MORE ACTIVITIES — next page from the server-side cursor ─────
+            elif message_data['type'] == 'more_activities':
+                destination = conv_manager.get_collected_info().get('destination')
+                options = []
+                has_more = False
+                if destination:
+                    shown_activities = mark_shown(shown_activities, destination, [])
+                    if activity_cursor is None or activity_cursor[0] != destination:
+                        activity_cursor = (destination, PagedCursor(
+                            activity_pages(destination), shown_activities[1], key=activity_key
+                        ))
+                    cursor = activity_cursor[1]
+                    count = bounded_int(message_data.get('count'), ACTIVITY_PAGE_SIZE, 1, ACTIVITY_PAGE_SIZE * 2)
+                    options = await upstream.run(cursor.take, count)
+                    shown_activities = mark_shown(shown_activities, destination, options)
+                    has_more = cursor.has_more
+                print(f"➕ Serving {len(options)} more activities (more left: {has_more})")
+
+                await websocket.send_text(to_json({
+                    'type': 'show_options',
+                    'options_type': 'activities',
+                    'options': options,
+                    'append': True,
+                    'has_more': has_more,
+                    'message': f'Here are {len(options)} more things to do:' if options else "That's everything I found!"
+                }))
+
             # ── ACTIVITY SELECTED ────────────────────────────────────────────
             elif message_data['type'] == 'select_activity':
                 activity_data = message_data['activity']
                 result = conv_manager.select_activity(activity_data)
                 print(f"🎯 Activity selected: {activity_data.get('name', 'Unknown')}")
 
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(to_json({
                     'type': 'bot_response',
                     'message': result['message'],
                     'collected_info': result['collected_info'],
@@ -290,7 +605,7 @@ async def voice_chat(websocket: WebSocket):
             elif message_data['type'] == 'finalize':
                 result = conv_manager.finalize_selections()
 
-                await websocket.send_text(json.dumps({
+                await websocket.send_text(to_json({
                     'type': 'bot_response',
                     'message': result['message'],
                     'collected_info': result['collected_info'],
@@ -304,11 +619,19 @@ async def voice_chat(websocket: WebSocket):
 
                 collected = conv_manager.get_collected_info()
 
+                # Tier-2 Places fields (rating, hours, photos) only for what was actually picked
+                try:
+                    selected_activities = await upstream.run(
+                        google_places_service.enrich_activities, collected.get('selected_activities', [])
+                    )
+                except asyncio.TimeoutError:
+                    selected_activities = collected.get('selected_activities', [])
+
                 # ✅ FIXED: correct method name and correct argument structure
                 available_options = {
                     'flights': [collected['selected_flight']] if collected.get('selected_flight') else [],
                     'hotels': [collected['selected_hotel']] if collected.get('selected_hotel') else [],
-                    'activities': collected.get('selected_activities', [])
+                    'activities': selected_activities
                 }
                 trip_context = {
                     'departure_city': collected.get('departure_city'),
@@ -320,21 +643,25 @@ async def voice_chat(websocket: WebSocket):
                 }
 
                 try:
-                    # ✅ FIXED: DebateCoordinator(azure_client) + .conduct_debate()
-                    debate_coordinator = DebateCoordinator(azure_client)
-                    debate_result = debate_coordinator.conduct_debate(trip_context, available_options)
+                    debate_result = await run_debate(
+                        websocket, trip_context, available_options,
+                        stream=message_data.get('stream', DEBATE_STREAMING),
+                        engine=message_data.get('engine', DEBATE_ENGINE),
+                        regenerate=bool(message_data.get('regenerate'))
+                    )
                     print("✅ Debate complete! Sending results...")
 
-                    await websocket.send_text(json.dumps({
+                    await websocket.send_text(to_json({
                         'type': 'planning_result',
                         'debate_transcript': debate_result['debate_transcript'],
-                        'final_decision': debate_result['final_decision']
+                        'final_decision': debate_result['final_decision'],
+                        'partial': bool(debate_result.get('partial'))
                     }))
 
                 except Exception as e:
                     print(f"❌ Debate error: {e}")
                     traceback.print_exc()
-                    await websocket.send_text(json.dumps({
+                    await websocket.send_text(to_json({
                         'type': 'planning_result',
                         'debate_transcript': [],
                         'final_decision': {
@@ -347,11 +674,17 @@ async def voice_chat(websocket: WebSocket):
                         }
                     }))
 
+            await upstream.run(conversations.save, session_id, conv_manager)
+
     except WebSocketDisconnect:
         print("⚠️ WebSocket client disconnected")
     except Exception as e:
         print(f"❌ WebSocket error: {e}")
         traceback.print_exc()
+    finally:
+        ACTIVE_WEBSOCKETS.dec()
+        if prefetcher is not None:
+            prefetcher.cancel_all()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,165 @@
+import re
+from typing import Annotated, Any, Optional
+
+from pydantic import BaseModel, BeforeValidator, ConfigDict, ValidationError, model_validator
+
+from utils.json_stream import loads_tolerant
+
+
+def _valid_items(model):
+    """List validator that drops elements failing `model` instead of rejecting the whole document"""
+    def keep(items):
+        if not isinstance(items, list):
+            return []
+        valid = []
+        for item in items:
+            try:
+                valid.append(model.model_validate(item))
+            except ValidationError:
+                continue
+        return valid
+    return BeforeValidator(keep)
+
+
+def _number(value):
+    """Amounts like "₹4,200" or "4200.50" as a float; anything unreadable is 0"""
+    if isinstance(value, (int, float)):
+        return value
+    match = re.search(r"-?\d+(?:\.\d+)?", str(value or "").replace(",", ""))
+    return float(match.group()) if match else 0
+
+
+Amount = Annotated[float, BeforeValidator(_number)]
+
+
+def _ref(value):
+    """Option ids as strings: the prompt tables print ids like 1 unquoted, so models echo numbers"""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if isinstance(value, (int, float)):
+        return str(value)
+    return value
+
+
+def _refs(values):
+    if not isinstance(values, list):
+        return []
+    return [_ref(value) for value in values if isinstance(_ref(value), str)]
+
+
+def _text(value):
+    return "" if value is None else value
+
+
+Ref = Annotated[str, BeforeValidator(_ref)]
+OptionalRef = Annotated[Optional[str], BeforeValidator(_ref)]
+Refs = Annotated[list[str], BeforeValidator(_refs)]
+Text = Annotated[str, BeforeValidator(_text)]
+
+
+class _Output(BaseModel):
+    # Unknown keys are kept: prompts evolve faster than these schemas
+    model_config = ConfigDict(extra="allow")
+
+
+# -----------------------------------
+# DEBATE
+# -----------------------------------
+
+class DebateEntry(_Output):
+    agent: Text = ""
+    preferred_flight: Any = ""
+    preferred_hotel: Any = ""
+    preferred_activities: list = []
+    argument: str
+    counterarguments: Any = ""
+
+
+class ScheduleSlot(_Output):
+    time_slot: str
+
+
+class ItineraryDay(_Output):
+    day: int
+    schedule: Annotated[list[ScheduleSlot], _valid_items(ScheduleSlot)]
+
+
+class FinalDecision(_Output):
+    flight_id: OptionalRef = None
+    hotel_id: OptionalRef = None
+    activity_ids: Refs = []
+    itinerary: Annotated[list[ItineraryDay], _valid_items(ItineraryDay)] = []
+    reasoning: Text = ""
+    key_tradeoffs: Text = ""
+
+
+class DebateResult(_Output):
+    debate_transcript: Annotated[list[DebateEntry], _valid_items(DebateEntry)] = []
+    final_decision: FinalDecision = FinalDecision()
+
+    @model_validator(mode="after")
+    def _not_empty(self):
+        # e.g. {"error": "..."} validates field-by-field but is not a debate
+        if not self.debate_transcript and not self.final_decision.itinerary:
+            raise ValueError("no debate entries or itinerary days in LLM output")
+        return self
+
+
+# -----------------------------------
+# SPECIALIST AGENTS
+# -----------------------------------
+
+class RecommendedFlight(_Output):
+    flight_id: Ref
+
+
+class FlightRecommendations(_Output):
+    recommended_flights: Annotated[list[RecommendedFlight], _valid_items(RecommendedFlight)] = []
+    total_cost: Amount = 0
+
+
+class RecommendedHotel(_Output):
+    hotel_id: Ref
+    total_cost: Amount = 0
+
+
+class HotelRecommendation(_Output):
+    recommended_hotel: Optional[RecommendedHotel] = None
+
+
+class PlannedActivity(_Output):
+    activity_id: Ref
+
+
+class ActivityDay(_Output):
+    day: int
+    activities: Annotated[list[PlannedActivity], _valid_items(PlannedActivity)] = []
+
+
+class ActivityPlan(_Output):
+    day_wise_activities: Annotated[list[ActivityDay], _valid_items(ActivityDay)] = []
+    total_cost: Amount = 0
+    reason: Text = ""
+
+
+def parse_llm_output(raw: str, schema) -> dict:
+    """
+    Parse and validate an LLM JSON answer against `schema`. Truncated output is
+    repaired (and marked "partial": True); elements that fail validation are
+    dropped. Raises ValueError when nothing usable is left.
+    """
+    data, complete = loads_tolerant(raw)
+    result = schema.model_validate(data).model_dump()
+    if not complete:
+        result["partial"] = True
+    return result
+
+
+def validate_item(schema, item: dict):
+    """One streamed element as a plain dict, or None if it does not match `schema`"""
+    try:
+        return schema.model_validate(item).model_dump()
+    except ValidationError:
+        return None
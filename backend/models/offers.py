@@ -0,0 +1,139 @@
+from dataclasses import dataclass, fields
+
+
+class _Record:
+    """
+    Shared wire helpers for the slot-based offer records.
+
+    to_wire() is the full client-facing dict (same keys the frontend has always
+    received); summary() is the compact projection used in LLM prompts.
+    Keys a record does not model (e.g. persona_match on mock data) are kept in
+    `extra` so client round-trips are lossless.
+    """
+
+    __slots__ = ()
+    _FIELDS = ()
+    _SUMMARY = ()
+    _ALIASES = {}
+
+    def to_wire(self) -> dict:
+        wire = {name: getattr(self, name) for name in self._FIELDS}
+        if self.extra:
+            for key, value in self.extra.items():
+                wire.setdefault(key, value)
+        return wire
+
+    def summary(self) -> dict:
+        summary = {}
+        for name in self._SUMMARY:
+            value = getattr(self, name)
+            if value not in (None, "", ()):
+                summary[name] = value
+        return summary
+
+    @classmethod
+    def from_wire(cls, data):
+        """Build a record from a wire/mock dict (records pass through unchanged)"""
+        if isinstance(data, cls) or data is None:
+            return data
+        known = {}
+        extra = {}
+        for key, value in data.items():
+            name = cls._ALIASES.get(key, key)
+            if name in cls._FIELDS and name not in known:
+                known[name] = tuple(value) if isinstance(value, list) else value
+            else:
+                extra[key] = value
+        return cls(**known, extra=extra or None)
+
+
+def _record(summary: tuple, aliases: dict = None):
+    def wrap(cls):
+        cls = dataclass(slots=True)(cls)
+        cls._FIELDS = tuple(f.name for f in fields(cls) if f.name != "extra")
+        cls._SUMMARY = summary
+        cls._ALIASES = aliases or {}
+        return cls
+    return wrap
+
+
+@_record(
+    summary=("id", "airline", "price", "currency", "departure_time", "arrival_time", "duration", "stops"),
+    aliases={"departure": "departure_time", "arrival": "arrival_time", "class": "cabin"},
+)
+class FlightOffer(_Record):
+    id: str = ""
+    price: float = 0
+    currency: str = "INR"
+    departure_time: str = ""
+    arrival_time: str = ""
+    duration: str = ""
+    stops: int = 0
+    airline: str = "Unknown"
+    departure_airport: str = ""
+    arrival_airport: str = ""
+    aircraft: str = "N/A"
+    cabin: str = "ECONOMY"
+    extra: dict = None
+
+
+@_record(summary=("id", "name", "price_per_night", "currency", "rating", "room_type"))
+class HotelOffer(_Record):
+    id: str = ""
+    name: str = ""
+    price_per_night: float = 0
+    currency: str = "INR"
+    rating: object = "N/A"
+    amenities: tuple = ()
+    room_type: str = "Standard"
+    extra: dict = None
+
+
+@_record(summary=("id", "name", "location", "category", "duration", "price", "rating", "opening_hours"))
+class Activity(_Record):
+    id: str = ""
+    name: str = ""
+    location: str = ""
+    address: str = ""
+    duration: str = "2 hours"
+    price: float = 0
+    time_of_day: str = "morning"
+    category: str = "Attraction"
+    rating: float = 0.0
+    rating_count: int = 0
+    opening_hours: str = ""
+    persona_match: tuple = ()
+    place_id: str = ""
+    latitude: float = None
+    longitude: float = None
+    photos: tuple = ()
+    extra: dict = None
+
+
+def to_wire(value):
+    """Recursively replace records inside dicts/lists with their wire dicts"""
+    if isinstance(value, _Record):
+        return value.to_wire()
+    if isinstance(value, dict):
+        return {key: to_wire(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_wire(item) for item in value]
+    return value
+
+
+def to_summary(value):
+    """Like to_wire(), but records collapse to their compact summary()"""
+    if isinstance(value, _Record):
+        return value.summary()
+    if isinstance(value, dict):
+        return {key: to_summary(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_summary(item) for item in value]
+    return value
+
+
+def wire_default(value):
+    """json.dumps(default=...) hook: serialize records without a pre-pass"""
+    if isinstance(value, _Record):
+        return value.to_wire()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -1,14 +1,58 @@
 from amadeus import Client, ResponseError
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import heapq
 import os
+import time
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
+from models.offers import Activity, FlightOffer, HotelOffer
+from utils.metrics import track_upstream
+from utils.persistent_cache import PersistentCache
+from utils.rate_limiter import TokenBucket
+from utils.ttl_cache import TTLCache
 
 load_dotenv()
 
 class AmadeusService:
     def __init__(self):
+        options = {}
+        if os.getenv('AMADEUS_HOST'):
+            # Point the SDK at a local stand-in (see loadtest/)
+            options = {
+                'host': os.getenv('AMADEUS_HOST'),
+                'port': int(os.getenv('AMADEUS_PORT', '443')),
+                'ssl': os.getenv('AMADEUS_SSL', 'true').lower() != 'false',
+            }
+
         self.client = Client(
             client_id=os.getenv('AMADEUS_API_KEY'),
-            client_secret=os.getenv('AMADEUS_API_SECRET')
+            client_secret=os.getenv('AMADEUS_API_SECRET'),
+            **options
+        )
+
+        self.flight_cache = TTLCache(
+            "flight_search",
+            max_entries=int(os.getenv('FLIGHT_CACHE_MAX_ENTRIES', '1000')),
+            ttl_seconds=float(os.getenv('FLIGHT_CACHE_TTL_SECONDS', '300'))
+        )
+
+        self.hotel_list_cache = PersistentCache(
+            "hotel_list",
+            ttl_seconds=float(os.getenv('HOTEL_LIST_CACHE_TTL_SECONDS', '604800')),
+            refresh_after_seconds=float(os.getenv('HOTEL_LIST_REFRESH_AFTER_SECONDS', '86400'))
+        )
+
+        # Shared budget for fan-out searches (flexible dates, multi-city legs)
+        self.rate_limiter = TokenBucket(float(os.getenv('AMADEUS_RATE_PER_SECOND', '8')))
+
+        # Hotel offers fan-out
+        self.hotel_batch_size = int(os.getenv('HOTEL_OFFERS_BATCH_SIZE', '5'))
+        self.hotel_offers_concurrency = int(os.getenv('HOTEL_OFFERS_CONCURRENCY', '4'))
+        self.hotel_offers_deadline = float(os.getenv('HOTEL_OFFERS_DEADLINE_SECONDS', '8'))
+        self.hotel_max_scan = int(os.getenv('HOTEL_MAX_SCAN', '40'))
+        self._pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('AMADEUS_MAX_CONCURRENCY', '8')),
+            thread_name_prefix="amadeus"
         )
 
     # -----------------------------------
@@ -16,22 +60,29 @@ class AmadeusService:
     # -----------------------------------
 
     def search_flights(self, departure_city, destination, departure_date, adults=1, max_results=5):
-        origin = departure_city
-        dest = destination
-
-        if not origin or not dest:
+        if not departure_city or not destination:
             return {"error": "Invalid city codes"}
 
+        # Identical searches from different sessions share one cached / in-flight upstream call
+        key = (departure_city.upper(), destination.upper(), departure_date, adults, max_results)
+        return self.flight_cache.get_or_load(
+            key,
+            lambda: self._search_flights_uncached(*key),
+            should_cache=lambda result: 'error' not in result
+        )
+
+    def _search_flights_uncached(self, origin, dest, departure_date, adults, max_results):
         try:
             print(f"🔍 Calling Amadeus Flights API: {origin} → {dest} on {departure_date}")
 
-            response = self.client.shopping.flight_offers_search.get(
-                originLocationCode=origin,
-                destinationLocationCode=dest,
-                departureDate=departure_date,
-                adults=adults,
-                max=max_results
-            )
+            with track_upstream("flight_search"):
+                response = self.client.shopping.flight_offers_search.get(
+                    originLocationCode=origin,
+                    destinationLocationCode=dest,
+                    departureDate=departure_date,
+                    adults=adults,
+                    max=max_results
+                )
 
             print("✅ Amadeus Flights API Success")
 
@@ -55,26 +106,26 @@ class AmadeusService:
 
                 formatted_duration = self._format_duration(itinerary.get('duration', ''))
 
-                flight_info = {
-                    'id': offer['id'],
-                    'price': final_price,
-                    'currency': final_currency,
+                flight_info = FlightOffer(
+                    id=offer['id'],
+                    price=final_price,
+                    currency=final_currency,
 
-                    'departure_time': segments[0]['departure']['at'],
-                    'arrival_time': segments[-1]['arrival']['at'],
-                    'duration': formatted_duration,
-                    'stops': len(segments) - 1,
+                    departure_time=segments[0]['departure']['at'],
+                    arrival_time=segments[-1]['arrival']['at'],
+                    duration=formatted_duration,
+                    stops=len(segments) - 1,
 
-                    'airline': segments[0].get('carrierCode', 'Unknown'),
+                    airline=segments[0].get('carrierCode', 'Unknown'),
 
                     # 🔥 NEW DETAILS
-                    'departure_airport': segments[0]['departure']['iataCode'],
-                    'arrival_airport': segments[-1]['arrival']['iataCode'],
-                    'aircraft': segments[0].get('aircraft', {}).get('code', 'N/A'),
-                    'cabin': offer.get('travelerPricings', [{}])[0]
-                                .get('fareDetailsBySegment', [{}])[0]
-                                .get('cabin', 'ECONOMY')
-                }
+                    departure_airport=segments[0]['departure']['iataCode'],
+                    arrival_airport=segments[-1]['arrival']['iataCode'],
+                    aircraft=segments[0].get('aircraft', {}).get('code', 'N/A'),
+                    cabin=offer.get('travelerPricings', [{}])[0]
+                              .get('fareDetailsBySegment', [{}])[0]
+                              .get('cabin', 'ECONOMY')
+                )
 
                 flights.append(flight_info)
 
@@ -84,81 +135,281 @@ class AmadeusService:
             print(f"❌ Amadeus Flight API Error: {error}")
             return {"error": str(error)}
 
+    def _search_flights_limited(self, departure_city, destination, departure_date, adults, max_results):
+        """search_flights() for fan-outs: only cache misses spend a rate-limiter token"""
+        if departure_city and destination:
+            key = (departure_city.upper(), destination.upper(), departure_date, adults, max_results)
+            if self.flight_cache.get(key) is None:
+                self.rate_limiter.acquire()
+        return self.search_flights(departure_city, destination, departure_date, adults, max_results)
+
+    def search_flights_flexible(self, departure_city, destination, departure_date, flex_days=2,
+                                adults=1, max_results=5):
+        """
+        Search departure_date ± flex_days concurrently (within the Amadeus rate budget).
+        Returns the offers for departure_date plus a per-date cheapest-fare calendar;
+        dates already in the flight cache cost no upstream call.
+        """
+        if not departure_city or not destination:
+            return {"error": "Invalid city codes"}
+        try:
+            center = datetime.strptime(departure_date, "%Y-%m-%d").date()
+        except (TypeError, ValueError):
+            return {"error": f"Invalid departure date: {departure_date}"}
+
+        today = date.today()
+        dates = [
+            (center + timedelta(days=offset)).isoformat()
+            for offset in range(-flex_days, flex_days + 1)
+            if center + timedelta(days=offset) >= today
+        ]
+
+        def search(day):
+            return day, self._search_flights_limited(departure_city, destination, day, adults, max_results)
+
+        start = time.perf_counter()
+        results = dict(self._pool.map(search, dates))
+        print(f"📅 Flexible search over {len(dates)} dates took {round((time.perf_counter() - start) * 1000)}ms")
+
+        calendar = []
+        for day in dates:
+            flights = results[day].get('flights') or []
+            cheapest = min(flights, key=lambda flight: flight.price) if flights else None
+            calendar.append({
+                'date': day,
+                'cheapest_price': cheapest.price if cheapest else None,
+                'currency': cheapest.currency if cheapest else None,
+                'offers': len(flights),
+                'error': results[day].get('error'),
+            })
+
+        priced = [entry for entry in calendar if entry['cheapest_price'] is not None]
+        requested = results.get(departure_date, {"error": "Departure date is in the past"})
+        result = dict(requested)
+        result['fare_calendar'] = calendar
+        result['cheapest_date'] = min(priced, key=lambda entry: entry['cheapest_price'])['date'] if priced else None
+        return result
+
+    def search_round_trip(self, departure_city, destination, departure_date, return_date,
+                          adults=1, max_results=5, top_k=5):
+        """Outbound + return legs searched concurrently, joined into the top_k cheapest pairs"""
+        return self.search_multi_city(
+            [(departure_city, destination, departure_date), (destination, departure_city, return_date)],
+            adults=adults, max_results=max_results, top_k=top_k
+        )
+
+    def search_multi_city(self, legs, adults=1, max_results=5, top_k=5):
+        """
+        legs: [(origin, destination, date), ...] in travel order.
+        Every leg is a cached one-way search issued concurrently, so changing one
+        leg only re-queries that leg. Returns the top_k cheapest combinations
+        (best-first over price-sorted legs, never the full cross product).
+        """
+        if not legs:
+            return {"error": "No flight legs given"}
+        dates = [leg[2] for leg in legs]
+        if dates != sorted(dates):
+            return {"error": "Flight legs must be in date order"}
+
+        start = time.perf_counter()
+        results = list(self._pool.map(
+            lambda leg: self._search_flights_limited(leg[0], leg[1], leg[2], adults, max_results), legs
+        ))
+        print(f"🧭 {len(legs)}-leg search took {round((time.perf_counter() - start) * 1000)}ms")
+
+        for (origin, dest, day), result in zip(legs, results):
+            if 'error' in result:
+                return {"error": f"{origin} → {dest} on {day}: {result['error']}"}
+            if not result.get('flights'):
+                return {"error": f"No flights {origin} → {dest} on {day}"}
+
+        options = [sorted(result['flights'], key=lambda flight: flight.price) for result in results]
+        itineraries = []
+        for indices in self._cheapest_combinations(options, top_k):
+            flights = [options[leg][i] for leg, i in enumerate(indices)]
+            itineraries.append({
+                'id': "+".join(flight.id for flight in flights),
+                'price': round(sum(flight.price for flight in flights), 2),
+                'currency': flights[0].currency,
+                'legs': flights,
+            })
+
+        return {'itineraries': itineraries, 'legs': [result['flights'] for result in results]}
+
+    @staticmethod
+    def _cheapest_combinations(options, top_k):
+        """Index tuples of the top_k lowest total prices, one offer per leg (lists sorted by price)"""
+        def total(indices):
+            return sum(options[leg][i].price for leg, i in enumerate(indices))
+
+        first = (0,) * len(options)
+        heap = [(total(first), first)]
+        seen = {first}
+        combinations = []
+        while heap and len(combinations) < top_k:
+            _, indices = heapq.heappop(heap)
+            combinations.append(indices)
+            for leg in range(len(options)):
+                if indices[leg] + 1 < len(options[leg]):
+                    nxt = indices[:leg] + (indices[leg] + 1,) + indices[leg + 1:]
+                    if nxt not in seen:
+                        seen.add(nxt)
+                        heapq.heappush(heap, (total(nxt), nxt))
+        return combinations
+
     # -----------------------------------
     # HOTELS
     # -----------------------------------
 
-    def search_hotels(self, city, check_in_date, check_out_date, adults=1):
+    def search_hotels(self, city, check_in_date, check_out_date, adults=1, max_hotels=5):
 
         try:
             print(f"🔍 Searching hotels in {city}")
 
-            response = self.client.reference_data.locations.hotels.by_city.get(
-                cityCode=city
+            list_start = time.perf_counter()
+            # Keyed on the API host too, so test/production/stand-in lists never mix
+            hotel_ids = self.hotel_list_cache.get_or_load(
+                f"{self.client.host}:{self.client.port}|{city.upper()}",
+                lambda: self._fetch_hotel_ids(city),
+                should_cache=bool
             )
+            list_ms = round((time.perf_counter() - list_start) * 1000)
 
-            if not response.data:
+            if not hotel_ids:
                 return {"error": "No hotels found"}
 
-            hotels = []
-            conversion_rate = 107.22
+            hotel_ids = hotel_ids[:self.hotel_max_scan]
 
-            for hotel in response.data[:5]:
-
-                hotel_id = hotel['hotelId']
+            offers_start = time.perf_counter()
+            hotels, scanned = self._fetch_hotel_offers(
+                hotel_ids, check_in_date, check_out_date, adults, max_hotels
+            )
+            timings = {
+                'hotel_list_ms': list_ms,
+                'hotel_offers_ms': round((time.perf_counter() - offers_start) * 1000),
+                'hotels_scanned': scanned,
+            }
+            print(f"⏱️ Hotel search timings: {timings}")
 
-                try:
-                    offer_response = self.client.shopping.hotel_offers_search.get(
-                        hotelIds=hotel_id,
-                        checkInDate=check_in_date,
-                        checkOutDate=check_out_date,
-                        adults=adults
-                    )
+            if not hotels:
+                return {"error": "No available hotel offers", "timings": timings}
 
-                    if not offer_response.data:
-                        continue
+            print(f"✅ Found {len(hotels)} hotels")
 
-                    hotel_data = offer_response.data[0]
-                    offer = hotel_data['offers'][0]
+            return {'hotels': hotels, 'timings': timings}
 
-                    price_value = float(offer['price']['total'])
-                    currency = offer['price']['currency']
+        except Exception as error:
+            print(f"❌ Amadeus Hotel API Error: {error}")
+            return {"error": str(error)}
 
-                    if currency == "EUR":
-                        final_price = round(price_value * conversion_rate, 2)
-                        final_currency = "INR"
+    def _fetch_hotel_ids(self, city):
+        """City → hotel ID list; near-static, so it sits behind the persistent hotel_list cache"""
+        with track_upstream("hotel_list"):
+            response = self.client.reference_data.locations.hotels.by_city.get(
+                cityCode=city
+            )
+        return [hotel['hotelId'] for hotel in response.data or []]
+
+    def _fetch_hotel_offers(self, hotel_ids, check_in_date, check_out_date, adults, max_hotels):
+        """
+        Price hotels in batches of hotel_batch_size IDs per request, keeping
+        hotel_offers_concurrency requests in flight, until max_hotels priced hotels
+        are found, the city's list is exhausted, or the deadline passes.
+        Returns (hotels in by_city order, number of IDs scanned).
+        """
+        deadline = time.monotonic() + self.hotel_offers_deadline
+        batches = [
+            hotel_ids[i:i + self.hotel_batch_size]
+            for i in range(0, len(hotel_ids), self.hotel_batch_size)
+        ]
+        found = {}
+        pending = set()
+        scanned = 0
+
+        while (pending or batches) and len(found) < max_hotels:
+            while batches and len(pending) < self.hotel_offers_concurrency:
+                ids = batches.pop(0)
+                scanned += len(ids)
+                pending.add(self._pool.submit(
+                    self._hotel_offers_batch, ids, check_in_date, check_out_date, adults
+                ))
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                print(f"⚠️ Hotel offers deadline reached with {len(found)} priced hotels")
+                break
+
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                ids, hotels, error = future.result()
+                if error is not None:
+                    if len(ids) > 1:
+                        # Fan the failed batch out one hotel per request
+                        batches[:0] = [[hotel_id] for hotel_id in ids]
+                        scanned -= len(ids)
                     else:
-                        final_price = price_value
-                        final_currency = currency
-
-                    hotel_info = {
-                        'id': hotel_id,
-                        'name': hotel_data['hotel']['name'],
-                        'price_per_night': final_price,
-                        'currency': final_currency,
-                        'rating': hotel_data['hotel'].get('rating', 'N/A'),
-                        'amenities': hotel_data['hotel'].get('amenities', [])[:5],
-                        'room_type': offer.get('room', {})
-                                    .get('typeEstimated', {})
-                                    .get('category', 'Standard')
-                    }
-
-                    hotels.append(hotel_info)
-
-                except Exception as inner_error:
-                    print(f"⚠️ Skipping hotel {hotel_id} due to error:", inner_error)
+                        print(f"⚠️ Skipping hotel {ids[0]} due to error:", error)
                     continue
+                for hotel in hotels:
+                    found[hotel.id] = hotel
 
-            if not hotels:
-                return {"error": "No available hotel offers"}
-
-            print(f"✅ Found {len(hotels)} hotels")
+        for future in pending:
+            future.cancel()
 
-            return {'hotels': hotels}
+        order = {hotel_id: i for i, hotel_id in enumerate(hotel_ids)}
+        hotels = sorted(found.values(), key=lambda hotel: order.get(hotel.id, len(order)))
+        return hotels[:max_hotels], scanned
 
+    def _hotel_offers_batch(self, hotel_ids, check_in_date, check_out_date, adults):
+        """One hotel_offers_search call for several hotels; returns (ids, hotels, error)"""
+        try:
+            with track_upstream("hotel_offers"):
+                offer_response = self.client.shopping.hotel_offers_search.get(
+                    hotelIds=",".join(hotel_ids),
+                    checkInDate=check_in_date,
+                    checkOutDate=check_out_date,
+                    adults=adults
+                )
         except Exception as error:
-            print(f"❌ Amadeus Hotel API Error: {error}")
-            return {"error": str(error)}
+            return hotel_ids, [], error
+
+        hotels = []
+        for hotel_data in offer_response.data or []:
+            if not hotel_data.get('offers'):
+                continue
+            try:
+                hotels.append(self._parse_hotel_offer(hotel_data))
+            except (KeyError, TypeError, ValueError) as error:
+                # One malformed offer must not discard the rest of the batch
+                hotel_id = (hotel_data.get('hotel') or {}).get('hotelId', '?')
+                print(f"⚠️ Skipping hotel {hotel_id}, unreadable offer:", error)
+        return hotel_ids, hotels, None
+
+    def _parse_hotel_offer(self, hotel_data):
+        conversion_rate = 107.22
+        offer = hotel_data['offers'][0]
+
+        price_value = float(offer['price']['total'])
+        currency = offer['price']['currency']
+
+        if currency == "EUR":
+            final_price = round(price_value * conversion_rate, 2)
+            final_currency = "INR"
+        else:
+            final_price = price_value
+            final_currency = currency
+
+        return HotelOffer(
+            id=hotel_data['hotel']['hotelId'],
+            name=hotel_data['hotel']['name'],
+            price_per_night=final_price,
+            currency=final_currency,
+            rating=hotel_data['hotel'].get('rating', 'N/A'),
+            amenities=tuple(hotel_data['hotel'].get('amenities', [])[:5]),
+            room_type=offer.get('room', {})
+                      .get('typeEstimated', {})
+                      .get('category', 'Standard')
+        )
 
     # -----------------------------------
     # ACTIVITIES
@@ -193,13 +444,13 @@ class AmadeusService:
             activities = []
 
             for activity in response.data[:10]:
-                activity_info = {
+                activity_info = Activity.from_wire({
                     'id': activity['id'],
                     'name': activity['name'],
                     'description': activity.get('shortDescription', ''),
                     'price': float(activity['price']['amount']) if 'price' in activity else 0,
                     'currency': activity['price']['currencyCode'] if 'price' in activity else 'INR'
-                }
+                })
 
                 activities.append(activity_info)
 
@@ -1,10 +1,57 @@
+import asyncio
 import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from models.offers import Activity
+from utils.metrics import UPSTREAM_ERRORS, UPSTREAM_RETRIES, track_upstream
+from utils.persistent_cache import PersistentCache
 
 class GooglePlacesService:
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    # Tier 1: Text Search Pro fields only, for every result. rating/userRatingCount
+    # would bill the whole list at the Enterprise SKU, so they are in tier 2
+    LIST_FIELD_MASK = (
+        "places.id,places.displayName,places.formattedAddress,places.location,"
+        "places.primaryTypeDisplayName"
+    )
+    # Tier 2: Enterprise fields, fetched per place only for activities the user selects
+    DETAILS_FIELD_MASK = "id,rating,userRatingCount,regularOpeningHours,photos"
+
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_PLACES_API_KEY")
-        self.base_url = "https://places.googleapis.com/v1/places:searchText"
+        self.api_root = os.getenv("GOOGLE_PLACES_BASE_URL", "https://places.googleapis.com/v1")
+        self.base_url = self.api_root + "/places:searchText"
+
+        self.timeout = float(os.getenv("PLACES_TIMEOUT_SECONDS", "10"))
+        self.max_retries = int(os.getenv("PLACES_MAX_RETRIES", "2"))
+        self.backoff_base = float(os.getenv("PLACES_BACKOFF_SECONDS", "0.5"))
+        self.backoff_max = float(os.getenv("PLACES_BACKOFF_MAX_SECONDS", "4"))
+        self.pool_size = int(os.getenv("PLACES_POOL_SIZE", "20"))
+        self.session = self._build_session()
+        self._async_client = None
+        self._async_loop = None
+
+        # Attractions change on the scale of weeks; serve from disk and revalidate in the background
+        self.places_cache = PersistentCache(
+            "places_text_search",
+            ttl_seconds=float(os.getenv("PLACES_CACHE_TTL_SECONDS", "2592000")),
+            refresh_after_seconds=float(os.getenv("PLACES_REFRESH_AFTER_SECONDS", "604800"))
+        )
+        self.details_cache = PersistentCache(
+            "place_details",
+            ttl_seconds=float(os.getenv("PLACES_CACHE_TTL_SECONDS", "2592000")),
+            refresh_after_seconds=float(os.getenv("PLACES_REFRESH_AFTER_SECONDS", "604800"))
+        )
+        self._details_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv("PLACE_DETAILS_CONCURRENCY", "6")), thread_name_prefix="place-details"
+        )
         self.city_map = {
             "mumbai": "Mumbai, India", "bombay": "Mumbai, India", "bom": "Mumbai, India",
             "delhi": "New Delhi, India", "new delhi": "New Delhi, India", "del": "New Delhi, India",
@@ -22,6 +69,119 @@ class GooglePlacesService:
         if not self.api_key:
             return {"error": "GOOGLE_PLACES_API_KEY not set in .env"}
 
+        full_city, headers, payload = self._build_request(city, max_results)
+        result = self.places_cache.get_or_load(
+            self._cache_key(headers, payload),
+            lambda: self._fetch_places(headers, payload),
+            should_cache=self._should_cache
+        )
+        return self._to_activities(result, city, full_city)
+
+    async def search_activities_async(self, city: str, max_results: int = 10) -> dict:
+        """search_activities() on a pooled httpx.AsyncClient, for use directly on the event loop"""
+        if not self.api_key:
+            return {"error": "GOOGLE_PLACES_API_KEY not set in .env"}
+
+        full_city, headers, payload = self._build_request(city, max_results)
+        key = self._cache_key(headers, payload)
+        # SQLite lookups block (file I/O, cache lock), so they run off the loop.
+        # Stale entries are served now and refreshed on the cache's own thread
+        result = await asyncio.to_thread(
+            self.places_cache.get,
+            key, refresh_loader=lambda: self._fetch_places(headers, payload), should_cache=self._should_cache
+        )
+        if result is None:
+            result = await self._fetch_places_async(headers, payload)
+            if self._should_cache(result):
+                await asyncio.to_thread(self.places_cache.set, key, result)
+        return self._to_activities(result, city, full_city)
+
+    def iter_activities(self, city: str, page_size: int = 10, max_pages: int = None):
+        """
+        Lazily yield pages of activities, following nextPageToken. Each page is one
+        Places request only when it is actually consumed, and is cached like page 1,
+        so paging through a city twice costs nothing.
+        """
+        if not self.api_key:
+            return
+
+        full_city, headers, payload = self._build_request(city, page_size)
+        base_key = self._cache_key(headers, payload)
+        token = None
+        page = 0
+        offset = 0
+        while max_pages is None or page < max_pages:
+            page_payload = dict(payload, pageToken=token) if token else payload
+            result = self.places_cache.get_or_load(
+                base_key if page == 0 else f"{base_key}|page={page}",
+                lambda page_payload=page_payload: self._fetch_places(headers, page_payload),
+                should_cache=self._should_cache
+            )
+            if "error" in result:
+                print(f"⚠️ Stopped paging {full_city} at page {page + 1}: {result['error']}")
+                return
+            if not result["places"]:
+                return
+
+            yield self._parse_activities(result["places"], city, offset)
+            offset += len(result["places"])
+            page += 1
+            token = result.get("next_page_token")
+            if not token:
+                return
+
+    def _fetch_places(self, headers: dict, payload: dict) -> dict:
+        try:
+            response = self._send("POST", self.base_url, headers, payload, call="places_text_search")
+            return self._handle_response(response.status_code, response.text, response.json)
+        except requests.exceptions.Timeout:
+            return {"error": "Google Places request timed out"}
+        except Exception as e:
+            return {"error": f"Google Places error: {str(e)}"}
+
+    def _send(self, method: str, url: str, headers: dict, payload: dict = None, call: str = "places_text_search"):
+        """One pooled request, retried on transient failures; returns the last response"""
+        for attempt in range(self.max_retries + 1):
+            with track_upstream(call):
+                try:
+                    response = self.session.request(
+                        method, url, headers=headers, json=payload, timeout=self.timeout
+                    )
+                except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                    if attempt == self.max_retries:
+                        raise
+                    response = None
+            if response is not None and response.status_code not in self.RETRY_STATUSES:
+                return response
+            if attempt < self.max_retries:
+                retry_after = response.headers.get("Retry-After") if response is not None else None
+                time.sleep(self._backoff(attempt, retry_after, call))
+        return response
+
+    async def _fetch_places_async(self, headers: dict, payload: dict) -> dict:
+        client = self._get_async_client()
+        try:
+            for attempt in range(self.max_retries + 1):
+                with track_upstream("places_text_search"):
+                    try:
+                        response = await client.post(self.base_url, headers=headers, json=payload)
+                    except (httpx.TimeoutException, httpx.TransportError):
+                        if attempt == self.max_retries:
+                            raise
+                        response = None
+                if response is not None and response.status_code not in self.RETRY_STATUSES:
+                    break
+                if attempt < self.max_retries:
+                    retry_after = response.headers.get("Retry-After") if response is not None else None
+                    await asyncio.sleep(self._backoff(attempt, retry_after, "places_text_search"))
+            return self._handle_response(response.status_code, response.text, response.json)
+
+        except httpx.TimeoutException:
+            return {"error": "Google Places request timed out"}
+        except Exception as e:
+            return {"error": f"Google Places error: {str(e)}"}
+
+    def _build_request(self, city: str, max_results: int):
         full_city = self.city_map.get(city.lower().strip(), f"{city}, India")
         query = f"Tourist attractions in {full_city}"
         print(f"🌍 Google Places query: {query}")
@@ -29,53 +189,154 @@ class GooglePlacesService:
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": (
-                "places.displayName,places.rating,places.formattedAddress,"
-                "places.regularOpeningHours,places.primaryTypeDisplayName,places.userRatingCount"
-            ),
+            "X-Goog-FieldMask": self.LIST_FIELD_MASK,
         }
-        payload = {"textQuery": query, "maxResultCount": max_results, "languageCode": "en"}
+        payload = {"textQuery": query, "pageSize": max_results, "languageCode": "en"}
+        return full_city, headers, payload
 
-        try:
-            response = requests.post(self.base_url, headers=headers, json=payload, timeout=10)
-            if response.status_code == 400:
-                return {"error": f"Bad request: {response.text}"}
-            if response.status_code == 403:
-                return {"error": "Invalid API key or Places API (New) not enabled in Google Cloud"}
-            if response.status_code == 429:
-                return {"error": "Google Places quota exceeded"}
-            response.raise_for_status()
-
-            places = response.json().get("places", [])
-            if not places:
-                return {"error": f"No places found for {full_city}"}
-
-            activities = self._parse_activities(places, city)
-            print(f"✅ Google Places returned {len(activities)} activities")
-            return {"activities": activities}
+    def _cache_key(self, headers: dict, payload: dict) -> str:
+        """
+        Endpoint + normalised query + field mask + page size. The API key is
+        deliberately not part of it; the endpoint is, so a stand-in server
+        (loadtest) never shares entries with the real API.
+        """
+        query = " ".join(payload["textQuery"].lower().split())
+        return f"{self.api_root}|{query}|{headers['X-Goog-FieldMask']}|{payload['pageSize']}|{payload['languageCode']}"
 
-        except requests.exceptions.Timeout:
-            return {"error": "Google Places request timed out"}
+    @staticmethod
+    def _should_cache(result: dict) -> bool:
+        return bool(result.get("places"))
+
+    def _handle_response(self, status_code: int, text: str, json_body) -> dict:
+        if status_code >= 400:
+            UPSTREAM_ERRORS.inc(call="places_text_search")
+        if status_code == 400:
+            return {"error": f"Bad request: {text}"}
+        if status_code == 403:
+            return {"error": "Invalid API key or Places API (New) not enabled in Google Cloud"}
+        if status_code == 429:
+            return {"error": "Google Places quota exceeded"}
+        if status_code >= 400:
+            return {"error": f"Google Places error: HTTP {status_code}"}
+        body = json_body()
+        return {"places": body.get("places", []), "next_page_token": body.get("nextPageToken")}
+
+    def _to_activities(self, result: dict, city: str, full_city: str) -> dict:
+        if "error" in result:
+            return result
+        if not result["places"]:
+            return {"error": f"No places found for {full_city}"}
+
+        activities = self._parse_activities(result["places"], city)
+        print(f"✅ Google Places returned {len(activities)} activities")
+        return {"activities": activities}
+
+    # -----------------------------------
+    # PLACE DETAILS (tier 2)
+    # -----------------------------------
+
+    def enrich_activities(self, activities: list) -> list:
+        """Fill rating, opening hours and photos for (selected) Places activities"""
+        details = self.get_place_details([activity.place_id for activity in activities])
+        enriched = []
+        for activity in activities:
+            place = details.get(activity.place_id)
+            if place:
+                activity = replace(
+                    activity,
+                    rating=place.get("rating", activity.rating),
+                    rating_count=place.get("userRatingCount", activity.rating_count),
+                    opening_hours=self._extract_opening_hours(place.get("regularOpeningHours", {})),
+                    photos=tuple(photo["name"] for photo in place.get("photos", [])[:3] if photo.get("name")),
+                )
+            enriched.append(activity)
+        return enriched
+
+    def get_place_details(self, place_ids: list) -> dict:
+        """place_id → details for a handful of places, fetched concurrently and cached per place"""
+        place_ids = list(dict.fromkeys(place_id for place_id in place_ids if place_id))
+        if not self.api_key or not place_ids:
+            return {}
+        results = self._details_pool.map(self._place_details, place_ids)
+        return {place_id: details for place_id, details in zip(place_ids, results) if "error" not in details}
+
+    def _place_details(self, place_id: str) -> dict:
+        return self.details_cache.get_or_load(
+            f"{self.api_root}|{place_id}|{self.DETAILS_FIELD_MASK}",
+            lambda: self._fetch_place_details(place_id),
+            should_cache=lambda details: "error" not in details
+        )
+
+    def _fetch_place_details(self, place_id: str) -> dict:
+        headers = {"X-Goog-Api-Key": self.api_key, "X-Goog-FieldMask": self.DETAILS_FIELD_MASK}
+        try:
+            response = self._send("GET", f"{self.api_root}/places/{place_id}", headers, call="place_details")
+            if response.status_code >= 400:
+                UPSTREAM_ERRORS.inc(call="place_details")
+                return {"error": f"Place details error: HTTP {response.status_code}"}
+            return response.json()
         except Exception as e:
-            return {"error": f"Google Places error: {str(e)}"}
+            return {"error": f"Place details error: {str(e)}"}
+
+    # -----------------------------------
+    # HTTP SESSIONS
+    # -----------------------------------
+
+    def _build_session(self) -> requests.Session:
+        """Keep-alive pool so repeated lookups skip the TLS handshake"""
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def _get_async_client(self) -> httpx.AsyncClient:
+        # httpx pools are bound to the loop that created them
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+                timeout=self.timeout,
+            )
+            self._async_loop = loop
+        return self._async_client
+
+    def _backoff(self, attempt: int, retry_after: str = None, call: str = "places_text_search") -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends one"""
+        UPSTREAM_RETRIES.inc(call=call)
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def close(self):
+        self.session.close()
+        self._details_pool.shutdown(wait=False)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
 
-    def _parse_activities(self, places: list, city: str) -> list:
+    def _parse_activities(self, places: list, city: str, offset: int = 0) -> list:
         activities = []
-        for i, place in enumerate(places):
-            activities.append({
-                "id": f"GPLACE_{i+1:03d}",
-                "name": place.get("displayName", {}).get("text", "Unknown Place"),
-                "location": city,
-                "address": place.get("formattedAddress", ""),
-                "duration": "2 hours",
-                "price": 0,
-                "time_of_day": "morning",
-                "category": place.get("primaryTypeDisplayName", {}).get("text", "Attraction"),
-                "rating": place.get("rating", 0.0),
-                "rating_count": place.get("userRatingCount", 0),
-                "opening_hours": self._extract_opening_hours(place.get("regularOpeningHours", {})),
-                "persona_match": ["budget", "luxury", "experience", "cultural", "balanced"],
-            })
+        for i, place in enumerate(places, start=offset):
+            activities.append(Activity(
+                id=f"GPLACE_{i+1:03d}",
+                place_id=place.get("id", ""),
+                name=place.get("displayName", {}).get("text", "Unknown Place"),
+                location=city,
+                address=place.get("formattedAddress", ""),
+                duration="2 hours",
+                price=0,
+                time_of_day="morning",
+                category=place.get("primaryTypeDisplayName", {}).get("text", "Attraction"),
+                rating=place.get("rating", 0.0),
+                rating_count=place.get("userRatingCount", 0),
+                opening_hours="Hours not available",  # filled by enrich_activities() once selected
+                latitude=place.get("location", {}).get("latitude"),
+                longitude=place.get("location", {}).get("longitude"),
+                persona_match=("budget", "luxury", "experience", "cultural", "balanced"),
+            ))
         return activities
 
     def _extract_opening_hours(self, hours_data: dict) -> str:
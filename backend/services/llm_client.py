@@ -0,0 +1,81 @@
+import os
+import threading
+
+import httpx
+from openai import AzureOpenAI, BadRequestError
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+_clients = {}
+_lock = threading.Lock()
+
+JSON_MODE = os.getenv("LLM_JSON_MODE", "1") != "0"
+_json_mode_unsupported = set()  # deployments that rejected response_format
+
+
+def _build_http_client() -> httpx.Client:
+    """Keep-alive connection pool shared by every request to Azure OpenAI"""
+    limits = httpx.Limits(
+        max_connections=int(os.getenv("LLM_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20")),
+        keepalive_expiry=float(os.getenv("LLM_KEEPALIVE_EXPIRY_SECONDS", "60")),
+    )
+    http2 = HTTP2_AVAILABLE and os.getenv("LLM_HTTP2", "1") != "0"
+    return httpx.Client(
+        limits=limits,
+        http2=http2,
+        timeout=httpx.Timeout(float(os.getenv("LLM_TIMEOUT_SECONDS", "120")), connect=10.0),
+    )
+
+
+def get_llm_client(name: str = "default") -> AzureOpenAI:
+    """
+    Process-wide AzureOpenAI client registry.
+    All conversations, debates and agents share one client (and its connection
+    pool) per name instead of paying a TLS handshake per session.
+    """
+    client = _clients.get(name)
+    if client is not None:
+        return client
+
+    with _lock:
+        if name not in _clients:
+            _clients[name] = AzureOpenAI(
+                api_key=os.getenv("AZURE_OPENAI_API_KEY"),
+                api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+                azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
+                http_client=_build_http_client(),
+            )
+        return _clients[name]
+
+
+def close_llm_clients():
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+def create_json_completion(client: AzureOpenAI, **kwargs):
+    """
+    chat.completions.create() in JSON mode (response_format json_object) where
+    the deployment supports it. Older models/API versions reject the parameter
+    with a 400; the deployment is then remembered and the call is retried
+    without it, relying on the prompt and the tolerant parser instead.
+    """
+    model = kwargs.get("model")
+    if not JSON_MODE or model in _json_mode_unsupported:
+        return client.chat.completions.create(**kwargs)
+    try:
+        return client.chat.completions.create(response_format={"type": "json_object"}, **kwargs)
+    except BadRequestError as e:
+        if "response_format" not in str(e):
+            raise
+        print(f"⚠️ Deployment {model} does not support JSON mode, using plain completions")
+        _json_mode_unsupported.add(model)
+        return client.chat.completions.create(**kwargs)
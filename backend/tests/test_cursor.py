@@ -0,0 +1,28 @@
+from models.offers import Activity
+from utils.cursor import PagedCursor
+
+
+def place(position, place_id):
+    return Activity(id=f"GPLACE_{position:03d}", place_id=place_id, name=place_id)
+
+
+def test_take_pulls_pages_lazily():
+    pulled = []
+
+    def pages():
+        for number in range(3):
+            pulled.append(number)
+            yield [place(number * 2 + i, f"p{number * 2 + i}") for i in range(2)]
+
+    cursor = PagedCursor(pages())
+    assert [a.place_id for a in cursor.take(3)] == ["p0", "p1", "p2"]
+    assert pulled == [0, 1]
+    assert [a.place_id for a in cursor.take(10)] == ["p3", "p4", "p5"]
+    assert not cursor.has_more
+
+
+def test_dedupes_on_key_not_positional_id():
+    # A refreshed page can shift places to new positions (new GPLACE_NNN ids)
+    pages = [[place(1, "eiffel"), place(2, "louvre")], [place(1, "louvre"), place(2, "orsay")]]
+    cursor = PagedCursor(pages, skip_ids={"eiffel"}, key=lambda a: a.place_id)
+    assert [a.place_id for a in cursor.take(5)] == ["louvre", "orsay"]
@@ -0,0 +1,141 @@
+import json
+
+import pytest
+
+from models.llm_output import DebateResult, parse_llm_output
+from utils.json_stream import JsonArrayStreamer, loads_tolerant
+
+DEBATE = {
+    "debate_transcript": [
+        {"agent": "Budget Agent", "argument": "Save on the {hotel}, not the \"view\"."},
+        {"agent": "Luxury Agent", "argument": "Comfort matters, see [1], [2]."},
+    ],
+    "final_decision": {
+        "itinerary": [
+            {"day": 1, "schedule": [{"time_slot": "morning", "activity_id": "A1"}]},
+            {"day": 2, "schedule": [{"time_slot": "evening", "activity_id": "A2"}]},
+        ],
+    },
+}
+RAW = json.dumps(DEBATE)
+
+
+# -----------------------------------
+# loads_tolerant
+# -----------------------------------
+
+def test_complete_document():
+    assert loads_tolerant(RAW) == (DEBATE, True)
+
+
+@pytest.mark.parametrize("wrapped", [
+    f"```json\n{RAW}\n```",
+    f"Here is the plan:\n{RAW}\nLet me know if you need changes.",
+    f"```\n{RAW}```",
+])
+def test_fences_and_prose_are_ignored(wrapped):
+    assert loads_tolerant(wrapped) == (DEBATE, True)
+
+
+def test_truncated_inside_string_keeps_complete_elements():
+    # Cut in the middle of the second argument, inside a string with brackets in it
+    cut = RAW[:RAW.index("Comfort matters, see [1]") + len("Comfort matters, see [")]
+    value, complete = loads_tolerant(cut)
+    assert not complete
+    assert value["debate_transcript"][0] == DEBATE["debate_transcript"][0]
+    assert value["debate_transcript"][1] == {"agent": "Luxury Agent"}
+
+
+def test_truncated_after_escaped_quote():
+    cut = RAW[:RAW.index('\\"view') + 2]
+    value, complete = loads_tolerant(cut)
+    assert not complete
+    assert value == {"debate_transcript": [{"agent": "Budget Agent"}]}
+
+
+def test_truncated_in_nested_array_keeps_finished_days():
+    cut = RAW[:RAW.index('"day": 2') + 12]
+    value, complete = loads_tolerant(cut)
+    assert not complete
+    assert value["debate_transcript"] == DEBATE["debate_transcript"]
+    assert value["final_decision"]["itinerary"][0] == DEBATE["final_decision"]["itinerary"][0]
+
+
+@pytest.mark.parametrize("raw", ["", "Sorry, I can't help with that.", '{"argument": "cut off'])
+def test_unrecoverable_output_raises(raw):
+    with pytest.raises(ValueError):
+        loads_tolerant(raw)
+
+
+# -----------------------------------
+# JsonArrayStreamer
+# -----------------------------------
+
+def _stream(text: str, chunk: int):
+    streamer = JsonArrayStreamer(("debate_transcript", "itinerary"))
+    items = []
+    for i in range(0, len(text), chunk):
+        items.extend(streamer.feed(text[i:i + chunk]))
+    return items
+
+
+@pytest.mark.parametrize("chunk", [1, 3, 7, 64])
+def test_streamer_yields_every_element_regardless_of_chunking(chunk):
+    items = _stream(f"```json\n{RAW}\n```", chunk)
+    assert items == [
+        ("debate_transcript", DEBATE["debate_transcript"][0]),
+        ("debate_transcript", DEBATE["debate_transcript"][1]),
+        ("itinerary", DEBATE["final_decision"]["itinerary"][0]),
+        ("itinerary", DEBATE["final_decision"]["itinerary"][1]),
+    ]
+
+
+def test_streamer_ignores_brackets_and_quotes_inside_strings():
+    text = json.dumps({"debate_transcript": [{"argument": "a } ] \" [ { b"}, {"argument": "c"}]})
+    assert [item for _, item in _stream(text, 5)] == [{"argument": "a } ] \" [ { b"}, {"argument": "c"}]
+
+
+def test_streamer_does_not_emit_unfinished_element():
+    cut = RAW[:RAW.index("Comfort matters")]
+    assert [item["agent"] for _, item in _stream(cut, 4)] == ["Budget Agent"]
+
+
+# -----------------------------------
+# parse_llm_output
+# -----------------------------------
+
+def test_truncated_debate_drops_partial_elements_and_is_marked():
+    cut = RAW[:RAW.index('"day": 2') + 12]
+    result = parse_llm_output(cut, DebateResult)
+    assert result["partial"] is True
+    assert [entry["agent"] for entry in result["debate_transcript"]] == ["Budget Agent", "Luxury Agent"]
+    assert [day["day"] for day in result["final_decision"]["itinerary"]] == [1]
+
+
+@pytest.mark.parametrize("raw", ['{"error": "nope"}', '{"debate_transcript": [{"agent": "Budget Agent"}]}'])
+def test_empty_debate_is_rejected(raw):
+    with pytest.raises(ValueError):
+        parse_llm_output(raw, DebateResult)
+
+
+def test_numeric_ids_are_coerced_to_strings():
+    raw = json.dumps({
+        "debate_transcript": [{"agent": "Budget Agent", "argument": "x"}],
+        "final_decision": {"flight_id": 1, "hotel_id": 2.0, "activity_ids": [3, "GPLACE_4", {"bad": 1}],
+                           "itinerary": [{"day": 1, "schedule": [{"time_slot": "morning", "activity_id": 3}]}]},
+    })
+    decision = parse_llm_output(raw, DebateResult)["final_decision"]
+    assert (decision["flight_id"], decision["hotel_id"], decision["activity_ids"]) == ("1", "2", ["3", "GPLACE_4"])
+
+
+def test_null_text_fields_do_not_drop_the_debate():
+    raw = json.dumps({
+        "debate_transcript": [{"agent": None, "argument": "x"}],
+        "final_decision": {"flight_id": None, "reasoning": None, "key_tradeoffs": None,
+                           "itinerary": [{"day": 1, "schedule": [{"time_slot": "morning"}]}]},
+    })
+    result = parse_llm_output(raw, DebateResult)
+    assert "partial" not in result
+    assert result["final_decision"]["reasoning"] == result["final_decision"]["key_tradeoffs"] == ""
+    assert result["final_decision"]["flight_id"] is None
+    assert result["debate_transcript"][0]["agent"] == ""
@@ -0,0 +1,202 @@
+import itertools
+import json
+import random
+from types import SimpleNamespace
+
+import pytest
+
+from debate.debate_coordinator import DebateCoordinator
+from models.offers import Activity, FlightOffer
+from services.amadeus_service import AmadeusService
+from utils.geo import haversine_km, plan_days
+
+
+# -----------------------------------
+# MULTI-CITY TOP-K
+# -----------------------------------
+
+@pytest.mark.parametrize("seed", range(20))
+def test_cheapest_combinations_match_brute_force(seed):
+    rng = random.Random(seed)
+    options = [
+        sorted((FlightOffer(id=f"{leg}-{i}", price=rng.randint(50, 120)) for i in range(rng.randint(1, 4))),
+               key=lambda flight: flight.price)
+        for leg in range(rng.randint(1, 4))
+    ]
+    top_k = rng.randint(1, 8)
+
+    def total(indices):
+        return sum(options[leg][i].price for leg, i in enumerate(indices))
+
+    combinations = AmadeusService._cheapest_combinations(options, top_k)
+    every = sorted(total(indices) for indices in itertools.product(*(range(len(leg)) for leg in options)))
+
+    assert len(set(combinations)) == len(combinations) == min(top_k, len(every))
+    # Ties can pick different tuples, but the totals must be the cheapest ones
+    assert [total(indices) for indices in combinations] == every[:top_k]
+
+
+# -----------------------------------
+# DAY PLANNING
+# -----------------------------------
+
+# Two neighbourhoods ~10 km apart, three stops each
+CLUSTERS = {
+    "west": [(48.860, 2.290), (48.858, 2.295), (48.862, 2.300)],
+    "east": [(48.850, 2.420), (48.852, 2.425), (48.848, 2.430)],
+}
+
+
+def activities():
+    return [
+        Activity(id=f"{area}{i}", latitude=lat, longitude=lng)
+        for area, points in CLUSTERS.items() for i, (lat, lng) in enumerate(points)
+    ]
+
+
+def test_plan_days_groups_nearby_stops():
+    days = plan_days(activities(), 2)
+    assert sorted(sorted(a.id[:4] for a in day) for day in days) == [["east"] * 3, ["west"] * 3]
+
+
+def test_plan_days_respects_capacity_and_keeps_everything():
+    stops = activities()
+    days = plan_days(stops, 3)
+    assert len(days) == 3
+    assert all(len(day) == 2 for day in days)
+    assert sorted(a.id for day in days for a in day) == sorted(a.id for a in stops)
+
+
+def test_plan_days_routes_by_nearest_neighbour():
+    day = plan_days(activities()[:3], 1)[0]
+    points = [(a.latitude, a.longitude) for a in day]
+    route = sum(haversine_km(points[i], points[i + 1]) for i in range(len(points) - 1))
+    shortest = min(
+        sum(haversine_km(p[i], p[i + 1]) for i in range(len(p) - 1)) for p in itertools.permutations(points)
+    )
+    assert route == pytest.approx(shortest)
+
+
+def test_plan_days_spreads_stops_without_coordinates():
+    stops = activities()[:2] + [Activity(id="x1"), Activity(id="x2"), {"id": "x3"}]
+    days = plan_days(stops, 3)
+    assert len(days) == 3
+    assert sorted(len(day) for day in days) == [1, 2, 2]
+
+
+def test_plan_days_more_days_than_stops():
+    days = plan_days(activities()[:1], 3)
+    assert [len(day) for day in days] == [1, 0, 0]
+
+
+# -----------------------------------
+# ID-ONLY REHYDRATION
+# -----------------------------------
+
+OPTIONS = {
+    "flights": [FlightOffer(id="1", airline="AI", price=100), FlightOffer(id="2", airline="6E", price=80)],
+    "hotels": [],
+    "activities": [
+        Activity(id="GPLACE_001", name="Louvre", address="Rue de Rivoli", rating=4.7),
+        Activity(id="GPLACE_002", name="Orsay"),
+    ],
+}
+
+
+@pytest.fixture
+def coordinator():
+    return DebateCoordinator(client=object(), id_only=True)
+
+
+def test_rehydrate_fills_options_from_ids(coordinator):
+    result = coordinator._rehydrate({
+        "debate_transcript": [{"agent": "Budget Agent", "preferred_flight": 2,
+                               "preferred_activities": ["GPLACE_002", "louvre"]}],
+        "final_decision": {
+            "flight_id": "2",
+            "hotel_id": None,
+            "activity_ids": ["GPLACE_002"],
+            "itinerary": [{"day": 1, "schedule": [{"time_slot": "morning", "activity_id": "GPLACE_001"}]}],
+        },
+    }, OPTIONS)
+
+    decision = result["final_decision"]
+    assert decision["flight"] is OPTIONS["flights"][1]
+    assert decision["hotel"] is None
+    assert decision["activities"] == [OPTIONS["activities"][1]]
+    slot = decision["itinerary"][0]["schedule"][0]
+    assert slot["activity_name"] == "Louvre" and slot["location"] == "Rue de Rivoli"
+    assert "activity_id" not in slot
+
+    entry = result["debate_transcript"][0]
+    assert entry["preferred_flight"] == "6E 2"
+    assert entry["preferred_activities"] == ["Orsay", "Louvre"]
+
+
+def test_rehydrate_unknown_ids(coordinator):
+    result = coordinator._rehydrate({
+        "debate_transcript": [{"agent": "Luxury Agent", "preferred_flight": "F-99",
+                               "preferred_hotel": None, "preferred_activities": ["nowhere"]}],
+        "final_decision": {
+            "flight_id": "F-99",
+            "activity_ids": ["nowhere", "GPLACE_404"],
+            "itinerary": [{"day": 1, "schedule": [{"time_slot": "evening", "activity_id": "nowhere"}]}],
+        },
+    }, OPTIONS)
+
+    decision = result["final_decision"]
+    # Unknown ids fall back to the first flight and all activities instead of failing
+    assert decision["flight"] is OPTIONS["flights"][0]
+    assert decision["activities"] == OPTIONS["activities"]
+    assert decision["itinerary"][0]["schedule"][0]["activity_name"] == "Free time"
+
+    entry = result["debate_transcript"][0]
+    assert entry["preferred_flight"] == "F-99"
+    assert entry["preferred_hotel"] == ""
+    assert entry["preferred_activities"] == ["nowhere"]
+
+
+@pytest.mark.parametrize("ref", [None, "", True, {"id": "1"}, ["1"]])
+def test_lookup_ignores_non_id_refs(coordinator, ref):
+    assert coordinator._lookup(OPTIONS["flights"], ref) is None
+
+
+@pytest.mark.parametrize("ref", [1, 1.0, " 1 "])
+def test_lookup_accepts_numeric_ids(coordinator, ref):
+    assert coordinator._lookup(OPTIONS["flights"], ref) is OPTIONS["flights"][0]
+
+
+# -----------------------------------
+# INTERRUPTED DEBATE STREAM
+# -----------------------------------
+
+def broken_stream_client(text):
+    def chunks(**kwargs):
+        for i in range(0, len(text), 16):
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + 16]))])
+        raise ConnectionError("connection reset")
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=chunks)))
+
+
+def run_stream(text):
+    coordinator = DebateCoordinator(client=broken_stream_client(text), id_only=True)
+    return list(coordinator.conduct_debate_stream({"start_date": "2027-01-01", "end_date": "2027-01-02"}, OPTIONS))
+
+
+def test_stream_broken_after_entries_keeps_them():
+    raw = json.dumps({"debate_transcript": [
+        {"agent": "Budget Agent", "argument": "Fly 6E.", "preferred_flight": "2"},
+        {"agent": "Luxury Agent", "argument": "Fly AI."},
+    ]})
+    events = run_stream(raw[:raw.index("Luxury")])
+
+    assert [event for event, _ in events] == ["debate_entry", "debate_error", "result"]
+    result = events[-1][1]
+    assert result["partial"] and not result.get("fallback")
+    assert [entry["agent"] for entry in result["debate_transcript"]] == ["Budget Agent"]
+
+
+def test_stream_broken_before_anything_streamed_falls_back():
+    events = run_stream('{"debate_transcript": [{"agent": "Bud')
+    assert [event for event, _ in events] == ["result"]
+    assert events[-1][1]["fallback"]
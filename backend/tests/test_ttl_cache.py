@@ -0,0 +1,149 @@
+import threading
+import time
+
+import pytest
+
+from conversation.session_store import SessionStore
+from utils.ttl_cache import TTLCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(time, "monotonic", clock)
+    monkeypatch.setattr(time, "time", clock)
+    return clock
+
+
+def run_concurrently(n, target):
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+# -----------------------------------
+# TTLCache
+# -----------------------------------
+
+def test_concurrent_loaders_share_one_call():
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60)
+    release = threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    threads, results, errors = run_concurrently(8, lambda: cache.get_or_load("key", loader))
+    while cache.stats()["misses"] + cache.stats()["coalesced"] < 8:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 8 and not errors
+    assert cache.stats()["coalesced"] == 7
+    assert cache.get("key") == "value"
+
+
+def test_loader_error_reaches_all_waiters_and_is_not_cached():
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60)
+    release = threading.Event()
+
+    def loader():
+        release.wait(5)
+        raise ConnectionError("upstream down")
+
+    threads, results, errors = run_concurrently(4, lambda: cache.get_or_load("key", loader))
+    while cache.stats()["misses"] + cache.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert not results
+    assert len(errors) == 4 and all(isinstance(e, ConnectionError) for e in errors)
+    assert cache.get("key") is None
+    assert cache.get_or_load("key", lambda: "recovered") == "recovered"
+
+
+def test_should_cache_false_is_not_stored():
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60)
+    assert cache.get_or_load("key", lambda: {"error": "x"}, should_cache=lambda v: "error" not in v)
+    assert cache.get("key") is None
+
+
+def test_lru_eviction_order():
+    cache = TTLCache("test", max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # a is now the most recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_entries_expire(clock):
+    cache = TTLCache("test", max_entries=10, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=300)
+    clock.now += 61
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats()["entries"] == 1
+
+
+# -----------------------------------
+# SessionStore
+# -----------------------------------
+
+class Manager:
+    def to_state(self):
+        return {}
+
+
+@pytest.fixture(autouse=True)
+def memory_sessions(monkeypatch):
+    monkeypatch.setenv("SESSION_BACKEND", "memory")
+
+
+def test_session_store_evicts_least_recently_used():
+    store = SessionStore(Manager, max_entries=2, ttl_seconds=60)
+    a = store.get_or_create("a")
+    store.get_or_create("b")
+    assert store.get_or_create("a") is a
+    store.get_or_create("c")  # evicts b
+    assert store.stats()["evicted"] == 1
+    assert store.get_or_create("a") is a
+    assert len(store) == 2
+
+
+def test_session_store_expires_idle_sessions(clock):
+    store = SessionStore(Manager, max_entries=10, ttl_seconds=60)
+    a = store.get_or_create("a")
+    clock.now += 30
+    b = store.get_or_create("b")
+    clock.now += 40  # a idle for 70s, b for 40s
+    store.get_or_create("c")
+    assert store.stats()["evicted"] == 1
+    assert store.get_or_create("b") is b
+    assert store.get_or_create("a") is not a
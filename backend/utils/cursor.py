@@ -0,0 +1,40 @@
+import threading
+
+
+class PagedCursor:
+    """
+    Server-side cursor over a lazy iterator of pages (lists of records with an `id`).
+    take(n) returns the next n unseen items, pulling further pages only when the
+    buffered ones run out; items whose key(item) (default: the id) is in `skip_ids`
+    (already shown) or was already buffered are dropped.
+    take() blocks on network pages, so call it off the event loop.
+    """
+
+    def __init__(self, pages, skip_ids=(), key=lambda item: item.id):
+        self._pages = iter(pages)
+        self._key = key
+        self._buffer = []
+        self._seen = set(skip_ids)
+        self._exhausted = False
+        self._lock = threading.Lock()
+
+    def take(self, n: int) -> list:
+        with self._lock:
+            while len(self._buffer) < n and not self._exhausted:
+                try:
+                    page = next(self._pages)
+                except StopIteration:
+                    self._exhausted = True
+                    break
+                for item in page:
+                    item_key = self._key(item)
+                    if item_key not in self._seen:
+                        self._seen.add(item_key)
+                        self._buffer.append(item)
+
+            items, self._buffer = self._buffer[:n], self._buffer[n:]
+            return items
+
+    @property
+    def has_more(self) -> bool:
+        return bool(self._buffer) or not self._exhausted
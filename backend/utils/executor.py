@@ -0,0 +1,110 @@
+import asyncio
+import contextlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class UpstreamExecutor:
+    """
+    Bounded thread pool for blocking upstream calls (Amadeus, Google Places, Azure OpenAI).
+    Keeps the FastAPI event loop free while one session waits on a slow API.
+    """
+
+    def __init__(self, max_workers: int = None, default_timeout: float = None):
+        self.max_workers = max_workers or int(os.getenv("UPSTREAM_MAX_WORKERS", "32"))
+        self.default_timeout = default_timeout or float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "30"))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="upstream")
+
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
+        self._peak_queued = 0
+        self._completed = 0
+        self._errors = 0
+        self._timeouts = 0
+
+    async def run(self, fn, *args, timeout: float = None, **kwargs):
+        """Run fn(*args, **kwargs) on the pool; raises asyncio.TimeoutError after `timeout` seconds"""
+        with self._lock:
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+
+        future = self._pool.submit(self._call, fn, args, kwargs)
+        future.add_done_callback(self._on_done)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.default_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise
+
+    async def stream(self, fn, *args, timeout: float = None, **kwargs):
+        """Iterate a blocking generator fn(*args, **kwargs) on the pool, yielding its items here"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+
+        def produce():
+            try:
+                for item in fn(*args, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, item)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, finished)
+
+        timeout = timeout or self.default_timeout
+        deadline = loop.time() + timeout
+        task = asyncio.ensure_future(self.run(produce, timeout=timeout))
+        try:
+            while True:
+                item = await asyncio.wait_for(queue.get(), max(0, deadline - loop.time()))
+                if item is finished:
+                    break
+                yield item
+            await task
+        finally:
+            stop.set()
+            task.cancel()
+            # Collect the task's outcome (e.g. its own TimeoutError) so it is never
+            # reported as "Task exception was never retrieved"
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+
+    def _call(self, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _on_done(self, future):
+        with self._lock:
+            if future.cancelled():
+                # Timed out before a worker picked it up, so _call never ran
+                self._queued -= 1
+            elif future.exception() is not None:
+                self._errors += 1
+            else:
+                self._completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "active": self._active,
+                "queued": self._queued,
+                "peak_queued": self._peak_queued,
+                "completed": self._completed,
+                "errors": self._errors,
+                "timeouts": self._timeouts,
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
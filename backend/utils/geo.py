@@ -0,0 +1,106 @@
+import math
+
+
+def haversine_km(a: tuple, b: tuple) -> float:
+    lat1, lng1 = map(math.radians, a)
+    lat2, lng2 = map(math.radians, b)
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371.0 * math.asin(math.sqrt(h))
+
+
+def plan_days(activities: list, num_days: int, iterations: int = 10) -> list:
+    """
+    Group activities into num_days geographically compact days, each in
+    nearest-neighbour visiting order. Balanced k-means (at most ceil(n / days)
+    per day) on activities with latitude/longitude; activities without
+    coordinates fill the lightest days afterwards. Returns a list of num_days lists.
+    """
+    num_days = max(1, num_days)
+    located = [a for a in activities if _coords(a) is not None]
+    unlocated = [a for a in activities if _coords(a) is None]
+    days = [[] for _ in range(num_days)]
+
+    if located:
+        k = min(num_days, len(located))
+        capacity = math.ceil(len(located) / k)
+        points = [_coords(a) for a in located]
+        centroids = _farthest_point_seeds(points, k)
+
+        assignment = None
+        for _ in range(iterations):
+            new_assignment = _capacitated_assign(points, centroids, capacity)
+            if new_assignment == assignment:
+                break
+            assignment = new_assignment
+            for c in range(k):
+                members = [points[i] for i, cluster in enumerate(assignment) if cluster == c]
+                if members:
+                    centroids[c] = (sum(p[0] for p in members) / len(members),
+                                    sum(p[1] for p in members) / len(members))
+
+        clusters = [[located[i] for i, cluster in enumerate(assignment) if cluster == c] for c in range(k)]
+        ordered = _order_days([_nearest_neighbour_route(cluster) for cluster in clusters if cluster])
+        days[:len(ordered)] = ordered
+
+    for activity in unlocated:
+        min(days, key=len).append(activity)
+    return days
+
+
+def _coords(activity):
+    if isinstance(activity, dict):
+        lat, lng = activity.get("latitude"), activity.get("longitude")
+    else:
+        lat, lng = getattr(activity, "latitude", None), getattr(activity, "longitude", None)
+    return (lat, lng) if lat is not None and lng is not None else None
+
+
+def _farthest_point_seeds(points: list, k: int) -> list:
+    """Deterministic k-means++-style seeding: start west-most, then always the farthest point"""
+    seeds = [min(points, key=lambda p: (p[1], p[0]))]
+    while len(seeds) < k:
+        seeds.append(max(points, key=lambda p: min(haversine_km(p, s) for s in seeds)))
+    return list(seeds)
+
+
+def _capacitated_assign(points: list, centroids: list, capacity: int) -> list:
+    """Closest (point, centroid) pairs first, skipping centroids that are full"""
+    pairs = sorted(
+        (haversine_km(p, c), i, j) for i, p in enumerate(points) for j, c in enumerate(centroids)
+    )
+    assignment = [None] * len(points)
+    load = [0] * len(centroids)
+    for _, i, j in pairs:
+        if assignment[i] is None and load[j] < capacity:
+            assignment[i] = j
+            load[j] += 1
+    return assignment
+
+
+def _nearest_neighbour_route(cluster: list) -> list:
+    """Visit order for one day: start at the outermost stop, then always the closest unvisited one"""
+    if len(cluster) <= 2:
+        return list(cluster)
+    points = [_coords(a) for a in cluster]
+    centre = (sum(p[0] for p in points) / len(points), sum(p[1] for p in points) / len(points))
+    remaining = list(range(len(cluster)))
+    current = max(remaining, key=lambda i: haversine_km(points[i], centre))
+    route = [current]
+    remaining.remove(current)
+    while remaining:
+        current = min(remaining, key=lambda i: haversine_km(points[current], points[i]))
+        route.append(current)
+        remaining.remove(current)
+    return [cluster[i] for i in route]
+
+
+def _order_days(days: list) -> list:
+    """Chain days so each starts near where the previous one ended"""
+    remaining = list(days)
+    ordered = [remaining.pop(0)]
+    while remaining:
+        last = _coords(ordered[-1][-1])
+        nearest = min(remaining, key=lambda day: haversine_km(last, _coords(day[0])))
+        remaining.remove(nearest)
+        ordered.append(nearest)
+    return ordered
@@ -0,0 +1,126 @@
+import json
+
+
+class JsonArrayStreamer:
+    """
+    Incremental scanner for LLM JSON output.
+
+    Feed it text as it streams in; it returns every object element of the
+    watched arrays (e.g. "debate_transcript", "itinerary") as soon as that
+    element's closing brace arrives, without waiting for the whole document.
+    """
+
+    def __init__(self, keys):
+        self.keys = set(keys)
+        self.buffer = ""
+        self._pos = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string = None
+        self._pending_key = None
+        self._stack = []  # (bracket, key) for every open container
+        self._item = None  # (key, start index, depth) of the element being captured
+
+    def feed(self, text: str) -> list:
+        """Consume more text; returns newly completed (key, obj) pairs"""
+        self.buffer += text
+        completed = []
+
+        while self._pos < len(self.buffer):
+            i = self._pos
+            c = self.buffer[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._last_string = self.buffer[self._string_start:i]
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i + 1
+            elif c == ":":
+                if self._stack and self._stack[-1][0] == "{":
+                    self._pending_key = self._last_string
+            elif c == ",":
+                self._pending_key = None
+            elif c in "{[":
+                parent = self._stack[-1] if self._stack else None
+                if c == "{" and self._item is None and parent and parent[0] == "[" and parent[1] in self.keys:
+                    self._item = (parent[1], i, len(self._stack) + 1)
+                self._stack.append((c, self._pending_key if c == "[" else None))
+                self._pending_key = None
+            elif c in "}]":
+                if not self._stack:
+                    continue
+                depth = len(self._stack)
+                self._stack.pop()
+                if c == "}" and self._item and self._item[2] == depth:
+                    key, start, _ = self._item
+                    self._item = None
+                    try:
+                        completed.append((key, json.loads(self.buffer[start:i + 1])))
+                    except json.JSONDecodeError:
+                        pass
+
+        return completed
+
+
+def loads_tolerant(text: str):
+    """
+    json.loads for LLM output. Skips markdown fences and prose around the
+    document; if the output was cut off (max_tokens, dropped stream), closes it
+    after the last complete value so every finished array element survives.
+    Returns (value, complete); raises ValueError when nothing is recoverable.
+    """
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    if not starts:
+        raise ValueError("no JSON document in LLM output")
+    text = text[min(starts):]
+
+    try:
+        return json.JSONDecoder().raw_decode(text)[0], True
+    except json.JSONDecodeError:
+        pass
+
+    for candidate in _truncation_candidates(text):
+        try:
+            return json.loads(candidate), False
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("LLM output is not valid JSON and could not be repaired")
+
+
+def _truncation_candidates(text: str):
+    """Prefixes ending after a complete value, closed with the brackets still open; longest first"""
+    cuts = []
+    closers = []
+    in_string = False
+    escape = False
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c in "{[":
+            closers.append("}" if c == "{" else "]")
+        elif c in "}]":
+            if not closers:
+                break
+            closers.pop()
+            cuts.append((i + 1, "".join(reversed(closers))))
+        elif c == ",":
+            cuts.append((i, "".join(reversed(closers))))
+    for cut, suffix in reversed(cuts):
+        yield text[:cut] + suffix
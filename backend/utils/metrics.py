@@ -0,0 +1,183 @@
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60, 120)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        REGISTRY.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels=()):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_label_str(self.labels, key)} {value}" for key, value in items]
+
+
+class Gauge(_Metric):
+    """Gauge set explicitly, or computed at scrape time from a callback returning {label_tuple: value}"""
+
+    kind = "gauge"
+
+    def __init__(self, name, documentation, labels=(), callback=None):
+        super().__init__(name, documentation, labels)
+        self._values = {}
+        self.callback = callback
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def render(self) -> list:
+        if self.callback is not None:
+            items = list(self.callback().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return self.header() + [f"{self.name}{_label_str(self.labels, key)} {value}" for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[i] += 1
+            entry[-2] += value
+            entry[-1] += 1
+
+    def render(self) -> list:
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._values.items()]
+        lines = self.header()
+        for key, entry in items:
+            for i, bound in enumerate(self.buckets):
+                lines.append(f"{self.name}_bucket{_label_str(self.labels + ('le',), key + (bound,))} {entry[i]}")
+            lines.append(f"{self.name}_bucket{_label_str(self.labels + ('le',), key + ('+Inf',))} {entry[-1]}")
+            lines.append(f"{self.name}_sum{_label_str(self.labels, key)} {entry[-2]}")
+            lines.append(f"{self.name}_count{_label_str(self.labels, key)} {entry[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+# -----------------------------------
+# APPLICATION METRICS
+# -----------------------------------
+
+UPSTREAM_LATENCY = Histogram(
+    "travel_upstream_latency_seconds",
+    "Latency of upstream calls (Amadeus, Google Places, Azure OpenAI)",
+    labels=("call",)
+)
+UPSTREAM_ERRORS = Counter(
+    "travel_upstream_errors_total",
+    "Failed upstream calls",
+    labels=("call",)
+)
+UPSTREAM_RETRIES = Counter(
+    "travel_upstream_retries_total",
+    "Upstream calls retried after a transient failure (429 / 5xx / timeout)",
+    labels=("call",)
+)
+WEBSOCKET_MESSAGES = Counter(
+    "travel_websocket_messages_total",
+    "Websocket messages received, by type",
+    labels=("type",)
+)
+ACTIVE_WEBSOCKETS = Gauge(
+    "travel_active_websockets",
+    "Currently open /ws/voice connections"
+)
+ACTIVE_WEBSOCKETS.set(0)
+OPTION_FETCHES = Counter(
+    "travel_option_fetches_total",
+    "Flight / hotel / activity option lists served",
+    labels=("kind",)
+)
+MOCK_FALLBACKS = Counter(
+    "travel_mock_fallbacks_total",
+    "Option lists served from mock data because the upstream API failed",
+    labels=("kind",)
+)
+
+
+@contextmanager
+def track_upstream(call: str):
+    """Time an upstream call; exceptions are counted as errors and re-raised"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        UPSTREAM_ERRORS.inc(call=call)
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe(time.perf_counter() - start, call=call)
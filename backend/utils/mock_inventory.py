@@ -0,0 +1,139 @@
+import json
+import os
+import threading
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+CITY_CODES = {
+    "mumbai": "BOM", "bombay": "BOM",
+    "delhi": "DEL", "new delhi": "DEL",
+    "bangalore": "BLR", "bengaluru": "BLR",
+    "goa": "GOI",
+    "chennai": "MAA", "madras": "MAA",
+    "kolkata": "CCU", "calcutta": "CCU",
+    "hyderabad": "HYD",
+    "pune": "PNQ",
+    "jaipur": "JAI",
+    "kochi": "COK", "cochin": "COK",
+}
+
+
+def city_code(city: str) -> str:
+    """Normalize a city name or IATA code to the IATA code used as index key"""
+    if not city:
+        return ""
+    key = city.strip().lower()
+    return CITY_CODES.get(key, key.upper())
+
+
+class MockInventory:
+    """
+    Loaded-once, indexed view of data/mock_*.json used by every mock fallback.
+
+    Files are re-parsed only when their mtime changes (checked at most every
+    reload_interval seconds), so degraded-API traffic never touches the disk.
+    """
+
+    FILES = {
+        "flights": "mock_flights.json",
+        "hotels": "mock_hotels.json",
+        "activities": "mock_activities.json",
+    }
+
+    def __init__(self, data_dir: str = DATA_DIR, reload_interval: float = None):
+        self.data_dir = data_dir
+        self.reload_interval = reload_interval if reload_interval is not None else float(
+            os.getenv("MOCK_RELOAD_INTERVAL_SECONDS", "2")
+        )
+        self._lock = threading.Lock()
+        self._mtimes = {}
+        self._checked_at = {}
+        self._indexes = {}
+
+    # -----------------------------------
+    # LOOKUPS
+    # -----------------------------------
+
+    def flights(self, origin: str = None, destination: str = None, date: str = None) -> list:
+        """Flights on a route (either end optional); all flights if nothing matches"""
+        index = self._index("flights")
+        key = (city_code(origin), city_code(destination))
+        if date and key + (date,) in index["by_route_date"]:
+            return list(index["by_route_date"][key + (date,)])
+        if origin and destination:
+            matches = index["by_route"].get(key)
+        elif destination:
+            matches = index["by_destination"].get(key[1])
+        else:
+            matches = None
+        return list(matches or index["all"])
+
+    def hotels(self, city: str) -> list:
+        return list(self._index("hotels")["by_city"].get(city_code(city), []))
+
+    def activities(self, city: str = None, persona: str = None) -> list:
+        """Activities in a city (optionally matching a persona); all activities if the city is unknown"""
+        index = self._index("activities")
+        code = city_code(city)
+        if persona and (code, persona) in index["by_city_persona"]:
+            return list(index["by_city_persona"][(code, persona)])
+        return list(index["by_city"].get(code) or index["all"])
+
+    # -----------------------------------
+    # LOADING / INDEXING
+    # -----------------------------------
+
+    def _index(self, kind: str) -> dict:
+        now = time.monotonic()
+        if kind in self._indexes and now - self._checked_at.get(kind, 0) < self.reload_interval:
+            return self._indexes[kind]
+
+        with self._lock:
+            path = os.path.join(self.data_dir, self.FILES[kind])
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError as e:
+                print(f"❌ Error loading mock {kind}: {e}")
+                mtime = None
+
+            if kind not in self._indexes or (mtime is not None and mtime != self._mtimes.get(kind)):
+                self._indexes[kind] = self._build(kind, path)
+                self._mtimes[kind] = mtime
+                print(f"📦 Loaded mock {kind} inventory")
+            self._checked_at[kind] = now
+            return self._indexes[kind]
+
+    def _build(self, kind: str, path: str) -> dict:
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            print(f"❌ Error loading mock {kind}: {e}")
+            data = {}
+
+        if kind == "flights":
+            flights = data.get("flights", [])
+            index = {"all": flights, "by_route": {}, "by_route_date": {}, "by_destination": {}}
+            for flight in flights:
+                route = (city_code(flight.get("from")), city_code(flight.get("to")))
+                index["by_route"].setdefault(route, []).append(flight)
+                index["by_destination"].setdefault(route[1], []).append(flight)
+                if flight.get("date"):
+                    index["by_route_date"].setdefault(route + (flight["date"],), []).append(flight)
+            return index
+
+        if kind == "hotels":
+            return {"by_city": {city_code(city): hotels for city, hotels in data.items()}}
+
+        activities = data.get("activities", [])
+        index = {"all": activities, "by_city": {}, "by_city_persona": {}}
+        for activity in activities:
+            code = city_code(activity.get("location"))
+            index["by_city"].setdefault(code, []).append(activity)
+            for persona in activity.get("persona_match", []):
+                index["by_city_persona"].setdefault((code, persona), []).append(activity)
+        return index
+
+
+inventory = MockInventory()
@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.ttl_cache import CACHE_REQUESTS
+
+
+class PersistentCache:
+    """
+    SQLite-backed stale-while-revalidate cache for near-static upstream data.
+
+    - age < refresh_after_seconds: served as-is
+    - refresh_after_seconds <= age < ttl_seconds: served immediately, refreshed in the background
+    - older or missing: loaded synchronously (one loader call per key at a time)
+
+    Entries survive restarts and are shared by every worker using the same file
+    (CACHE_DB_PATH, default cache.db). Values must be JSON-serializable.
+    """
+
+    _LOCK_STRIPES = 64
+
+    def __init__(self, name: str, ttl_seconds: float, refresh_after_seconds: float, path: str = None):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.refresh_after_seconds = refresh_after_seconds
+        self.path = path or os.getenv("CACHE_DB_PATH", "cache.db")
+
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache (name TEXT NOT NULL, key TEXT NOT NULL, "
+            "value TEXT NOT NULL, stored_at REAL NOT NULL, PRIMARY KEY (name, key))"
+        )
+        self._db.commit()
+
+        self._key_locks = [threading.Lock() for _ in range(self._LOCK_STRIPES)]
+        self._refreshing = set()
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix=f"{name}-refresh")
+        self._counts = {"hit": 0, "stale": 0, "miss": 0}
+
+    def get_or_load(self, key, loader, should_cache=lambda value: True):
+        key = self._key(key)
+
+        entry = self._read(key)
+        if entry is not None:
+            value, age = entry
+            if age < self.refresh_after_seconds:
+                self._count("hit")
+                return value
+            self._count("stale")
+            self._schedule_refresh(key, loader, should_cache)
+            return value
+
+        with self._key_locks[hash(key) % self._LOCK_STRIPES]:
+            # Another caller may have filled the entry while we waited for the lock
+            entry = self._read(key)
+            if entry is not None:
+                self._count("hit")
+                return entry[0]
+            self._count("miss")
+            value = loader()
+            if should_cache(value):
+                self._write(key, value)
+            return value
+
+    def get(self, key, refresh_loader=None, should_cache=lambda value: True):
+        """
+        Non-loading lookup for callers that fetch misses themselves (e.g. async code):
+        returns the cached value or None; stale entries are refreshed in the
+        background via refresh_loader.
+        """
+        key = self._key(key)
+        entry = self._read(key)
+        if entry is None:
+            self._count("miss")
+            return None
+        value, age = entry
+        if age < self.refresh_after_seconds:
+            self._count("hit")
+        else:
+            self._count("stale")
+            if refresh_loader is not None:
+                self._schedule_refresh(key, refresh_loader, should_cache)
+        return value
+
+    def set(self, key, value):
+        self._write(self._key(key), value)
+
+    def invalidate(self, key):
+        key = self._key(key)
+        with self._db_lock:
+            self._db.execute("DELETE FROM cache WHERE name = ? AND key = ?", (self.name, key))
+            self._db.commit()
+
+    @staticmethod
+    def _key(key) -> str:
+        return key if isinstance(key, str) else json.dumps(key, sort_keys=True)
+
+    def _schedule_refresh(self, key: str, loader, should_cache):
+        with self._db_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = loader()
+                if should_cache(value):
+                    self._write(key, value)
+            except Exception as e:
+                print(f"⚠️ Background refresh of {self.name} cache failed: {e}")
+            finally:
+                with self._db_lock:
+                    self._refreshing.discard(key)
+
+        self._refresh_pool.submit(refresh)
+
+    def _read(self, key: str):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT value, stored_at FROM cache WHERE name = ? AND key = ?", (self.name, key)
+            ).fetchone()
+        if row is None:
+            return None
+        age = time.time() - row[1]
+        if age >= self.ttl_seconds:
+            return None
+        return json.loads(row[0]), age
+
+    def _write(self, key: str, value):
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (name, key, value, stored_at) VALUES (?, ?, ?, ?)",
+                (self.name, key, json.dumps(value, separators=(",", ":")), time.time())
+            )
+            self._db.execute(
+                "DELETE FROM cache WHERE name = ? AND stored_at < ?", (self.name, time.time() - self.ttl_seconds)
+            )
+            self._db.commit()
+
+    def _count(self, result: str):
+        self._counts[result] += 1
+        CACHE_REQUESTS.inc(cache=self.name, result=result)
+
+    def stats(self) -> dict:
+        with self._db_lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM cache WHERE name = ?", (self.name,)).fetchone()[0]
+        return {
+            "entries": entries,
+            "ttl_seconds": self.ttl_seconds,
+            "refresh_after_seconds": self.refresh_after_seconds,
+            "hits": self._counts["hit"],
+            "stale_hits": self._counts["stale"],
+            "misses": self._counts["miss"],
+        }
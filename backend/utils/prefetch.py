@@ -0,0 +1,55 @@
+import asyncio
+
+
+class OptionPrefetcher:
+    """
+    Per-session speculative prefetch of flight / hotel / activity options.
+
+    Each kind declares the collected_info fields it depends on. As soon as all of
+    them are known a background task is started; if the user later changes one of
+    those facts the stale task is cancelled and a fresh one takes its place.
+    """
+
+    def __init__(self, fetchers: dict):
+        # kind -> (async fetch(collected) -> list, required field names)
+        self.fetchers = fetchers
+        self._tasks = {}  # kind -> (key, asyncio.Task)
+
+    def _key(self, kind: str, collected: dict):
+        _, fields = self.fetchers[kind]
+        values = tuple(collected.get(field) for field in fields)
+        return values if all(values) else None
+
+    def update(self, collected: dict):
+        """Start or refresh prefetches for every kind whose inputs are complete"""
+        for kind, (fetch, _) in self.fetchers.items():
+            key = self._key(kind, collected)
+            current = self._tasks.get(kind)
+            if current and current[0] == key:
+                continue
+            if current:
+                print(f"♻️ Trip facts changed, refreshing {kind} prefetch")
+                current[1].cancel()
+                del self._tasks[kind]
+            if key is not None:
+                print(f"⚡ Prefetching {kind} for {key}")
+                self._tasks[kind] = (key, asyncio.create_task(fetch(dict(collected))))
+
+    async def get(self, kind: str, collected: dict) -> list:
+        """Serve from the matching prefetch if there is one, otherwise fetch now"""
+        fetch, _ = self.fetchers[kind]
+        current = self._tasks.get(kind)
+        if current and current[0] == self._key(kind, collected):
+            task = current[1]
+            if task.done():
+                print(f"⚡ Serving {kind} from prefetch")
+            try:
+                return await task
+            except Exception as e:
+                print(f"⚠️ Prefetch of {kind} failed ({e}), fetching again")
+        return await fetch(collected)
+
+    def cancel_all(self):
+        for _, task in self._tasks.values():
+            task.cancel()
+        self._tasks.clear()
@@ -0,0 +1,105 @@
+import json
+import os
+
+from models.offers import to_summary, wire_default
+from utils.metrics import Counter
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # optional: fall back to the ~4 chars/token rule of thumb
+    _ENCODING = None
+
+LLM_TOKENS = Counter(
+    "travel_llm_tokens_total",
+    "LLM tokens by call and direction (input, output)",
+    labels=("call", "direction")
+)
+
+# Columns the model actually needs per option kind (records and mock dicts alike)
+OPTION_FIELDS = {
+    "flights": ("id", "airline", "price", "departure_time", "arrival_time", "duration", "stops"),
+    "hotels": ("id", "name", "price_per_night", "rating", "room_type"),
+    "activities": ("id", "name", "category", "rating", "price", "duration", "opening_hours"),
+}
+
+OPTIONS_TOKEN_BUDGET = int(os.getenv("PROMPT_OPTIONS_TOKEN_BUDGET", "1500"))
+
+
+def estimate_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+
+def compact_json(value) -> str:
+    """Single-line JSON with records collapsed to their summary()"""
+    return json.dumps(to_summary(value), separators=(",", ":"), ensure_ascii=False, default=wire_default)
+
+
+def encode_table(items: list, fields: tuple, token_budget: int = None) -> str:
+    """
+    Pipe-separated table (header row + one row per item): far fewer tokens than
+    JSON for uniform records. Rows are kept in the given order, so callers sort
+    by relevance first; trailing rows that do not fit token_budget are dropped.
+    """
+    if not items:
+        return "(none)"
+    lines = [" | ".join(fields)]
+    used = estimate_tokens(lines[0])
+    for i, item in enumerate(items):
+        row = " | ".join(_cell(_field(item, name)) for name in fields)
+        cost = estimate_tokens(row)
+        if token_budget is not None and used + cost > token_budget and i > 0:
+            lines.append(f"(+{len(items) - i} more omitted)")
+            break
+        lines.append(row)
+        used += cost
+    return "\n".join(lines)
+
+
+def format_options(available_options: dict, token_budget: int = None) -> str:
+    """
+    One table per option kind. Debate options are the user's own selections, so
+    no row is dropped unless a token_budget is given; then the smallest kinds are
+    rendered first and whatever they leave unused goes to the remaining kinds.
+    """
+    kinds = [kind for kind in available_options if kind in OPTION_FIELDS]
+    tables = {}
+    remaining = token_budget
+    for i, kind in enumerate(sorted(kinds, key=lambda kind: len(available_options[kind]))):
+        share = None if token_budget is None else remaining // (len(kinds) - i)
+        tables[kind] = encode_table(available_options[kind], OPTION_FIELDS[kind], share)
+        if token_budget is not None:
+            remaining -= estimate_tokens(tables[kind])
+    return "\n\n".join(f"{kind}:\n{tables[kind]}" for kind in kinds)
+
+
+def log_llm_usage(call: str, prompt: str, response=None, completion: str = None):
+    """Record input/output tokens for one LLM call (API usage when reported, else estimated)"""
+    usage = getattr(response, "usage", None)
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or estimate_tokens(prompt)
+    if getattr(usage, "completion_tokens", None):
+        completion_tokens = usage.completion_tokens
+    else:
+        completion_tokens = estimate_tokens(completion) if completion else 0
+    LLM_TOKENS.inc(prompt_tokens, call=call, direction="input")
+    LLM_TOKENS.inc(completion_tokens, call=call, direction="output")
+    print(f"🧮 {call} tokens: in={prompt_tokens} out={completion_tokens}")
+
+
+def _field(item, name: str):
+    if isinstance(item, dict):
+        return item.get(name)
+    value = getattr(item, name, None)
+    if value is None and getattr(item, "extra", None):
+        value = item.extra.get(name)
+    return value
+
+
+def _cell(value) -> str:
+    if value is None or value == "":
+        return "-"
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(v) for v in value)
+    return str(value).replace("|", "/").replace("\n", " ")
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+
+from utils.metrics import Counter
+
+CACHE_REQUESTS = Counter(
+    "travel_cache_requests_total",
+    "Cache lookups by cache and outcome (hit, miss, coalesced)",
+    labels=("cache", "result")
+)
+
+_MISSING = object()
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class TTLCache:
+    """
+    Thread-safe, size-bounded LRU cache with per-entry TTL and single-flight
+    loading: concurrent get_or_load() calls for the same key share one loader call.
+    """
+
+    def __init__(self, name: str, max_entries: int, ttl_seconds: float):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get_locked(key)
+        return default if value is _MISSING else value
+
+    def lookup(self, key, default=None):
+        """get() that counts the hit or miss, for callers that load outside get_or_load()"""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is _MISSING:
+                self._misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="miss")
+                return default
+            self._hits += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return value
+
+    def set(self, key, value, ttl_seconds: float = None):
+        with self._lock:
+            self._set_locked(key, value, ttl_seconds)
+
+    def get_or_load(self, key, loader, should_cache=lambda value: True):
+        """Return the cached value for key, or call loader() once for all concurrent callers"""
+        with self._lock:
+            value = self._get_locked(key)
+            if value is not _MISSING:
+                self._hits += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="hit")
+                return value
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                inflight = self._inflight[key] = _InFlight()
+                leader = True
+                self._misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="miss")
+            else:
+                leader = False
+                self._coalesced += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="coalesced")
+
+        if not leader:
+            inflight.event.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.value
+
+        try:
+            inflight.value = loader()
+            if should_cache(inflight.value):
+                self.set(key, inflight.value)
+            return inflight.value
+        except Exception as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.event.set()
+
+    def _get_locked(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _set_locked(self, key, value, ttl_seconds: float = None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "coalesced": self._coalesced,
+            }